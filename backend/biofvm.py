@@ -52,6 +52,16 @@ class SubstrateField:
         if all(0 <= pos < dim for pos, dim in zip(position, self.concentration.shape)):
             self.source_sink[position] += amount
             
+    def add_sources(self, voxels: np.ndarray, amounts: np.ndarray):
+        """
+        Add many sources at once; amounts at repeated voxels accumulate.
+        
+        Args:
+            voxels: (N, 3) array of in-bounds voxel indices
+            amounts: (N,) array of source amounts
+        """
+        np.add.at(self.source_sink, (voxels[:, 0], voxels[:, 1], voxels[:, 2]), amounts)
+    
     def add_sink(self, position: Tuple[int, ...], amount: float):
         """Add a sink (consumption) at a specific position."""
         if all(0 <= pos < dim for pos, dim in zip(position, self.concentration.shape)):
@@ -120,11 +130,15 @@ class Microenvironment:
         
         # Store substrates
         self.substrates: Dict[str, SubstrateField] = {}
+        self.substrate_indices: Dict[str, int] = {}  # Stable position of each substrate in self.substrates
         
         # Track simulation time
         self.time = 0.0  # minutes
         self.dt = 0.01  # timestep in minutes (will be adjusted for stability)
         
+        # Stacked gradient fields of all substrates, valid until the next diffusion step
+        self._gradient_stack: Optional[np.ndarray] = None
+        
         print(f"[MICROENV] Initialized {dimensionality}D microenvironment:")
         print(f"  Grid: {self.nx} x {self.ny} x {self.nz}")
         print(f"  Voxel size: {dx} x {dy} x {dz} µm")
@@ -165,6 +179,8 @@ class Microenvironment:
         )
         
         self.substrates[name] = substrate
+        self.substrate_indices.setdefault(name, len(self.substrate_indices))
+        self._gradient_stack = None
         
         # Recalculate timestep for numerical stability
         self._update_timestep()
@@ -258,6 +274,7 @@ class Microenvironment:
         # OPTIMIZATION: Combined vectorized update and clipping
         dC_dt = D * laplacian - λ * C + S
         substrate.concentration = np.maximum(C + dt * dC_dt, 0.0)
+        self._gradient_stack = None
     
     def step(self, dt: Optional[float] = None):
         """
@@ -279,6 +296,10 @@ class Microenvironment:
         """Get a substrate by name."""
         return self.substrates.get(name)
     
+    def substrate_index(self, name: str) -> int:
+        """Get the stable index of a substrate, or -1 if it does not exist."""
+        return self.substrate_indices.get(name, -1)
+    
     def get_concentration_at(self, substrate_name: str, position: Tuple[float, ...]) -> float:
         """
         Get substrate concentration at a continuous position (with interpolation).
@@ -300,9 +321,9 @@ class Microenvironment:
         k = 0 if self.dimensionality == 2 else (position[2] - self.z_range[0]) / self.dz
         
         # Bounds check
-        i = np.clip(i, 0, self.nx - 1)
-        j = np.clip(j, 0, self.ny - 1)
-        k = np.clip(k, 0, self.nz - 1)
+        i = min(max(i, 0), self.nx - 1)
+        j = min(max(j, 0), self.ny - 1)
+        k = min(max(k, 0), self.nz - 1)
         
         # Simple nearest-neighbor for now (could upgrade to trilinear interpolation)
         i_idx = int(round(i))
@@ -311,6 +332,61 @@ class Microenvironment:
         
         return float(substrate.concentration[i_idx, j_idx, k_idx])
     
+    def sample_batch(self, substrate_names: Tuple[str, ...], positions: np.ndarray) -> np.ndarray:
+        """
+        Get several substrate concentrations at many positions at once.
+        
+        Same nearest-neighbor sampling as get_concentration_at, with the voxel
+        indices for all positions computed in one vectorized expression.
+        
+        Args:
+            substrate_names: Names of substrates (missing ones give 0.0)
+            positions: (N, 2) or (N, 3) array of positions in microns
+            
+        Returns:
+            (len(substrate_names), N) array of concentrations
+        """
+        return self.sample_voxels(substrate_names, self.positions_to_nearest_voxels(positions))
+    
+    def sample_voxels(self, substrate_names: Tuple[str, ...], voxels: np.ndarray) -> np.ndarray:
+        """
+        Get several substrate concentrations at precomputed voxel indices.
+        
+        Args:
+            substrate_names: Names of substrates (missing ones give 0.0)
+            voxels: (N, 3) array of voxel indices, as from positions_to_nearest_voxels
+            
+        Returns:
+            (len(substrate_names), N) array of concentrations
+        """
+        index = (voxels[:, 0], voxels[:, 1], voxels[:, 2])
+        concentrations = np.zeros((len(substrate_names), len(voxels)))
+        for row, name in enumerate(substrate_names):
+            substrate = self.substrates.get(name)
+            if substrate is not None:
+                concentrations[row] = substrate.concentration[index]
+        return concentrations
+    
+    def positions_to_nearest_voxels(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Nearest voxel indices (the sampling used by get_concentration_at) for many positions.
+        
+        Args:
+            positions: (N, 2) or (N, 3) array of positions in microns
+            
+        Returns:
+            (N, 3) array of voxel indices
+        """
+        positions = np.asarray(positions, dtype=float)
+        voxels = np.zeros((len(positions), 3), dtype=np.intp)
+        if len(positions) == 0:
+            return voxels
+        voxels[:, 0] = np.rint(np.clip((positions[:, 0] - self.x_range[0]) / self.dx, 0, self.nx - 1))
+        voxels[:, 1] = np.rint(np.clip((positions[:, 1] - self.y_range[0]) / self.dy, 0, self.ny - 1))
+        if self.dimensionality != 2:
+            voxels[:, 2] = np.rint(np.clip((positions[:, 2] - self.z_range[0]) / self.dz, 0, self.nz - 1))
+        return voxels
+    
     def get_gradient_at(self, substrate_name: str, position: Tuple[float, ...]) -> np.ndarray:
         """
         Compute substrate gradient at a position for chemotaxis.
@@ -334,9 +410,9 @@ class Microenvironment:
         k = 0 if self.dimensionality == 2 else int((position[2] - self.z_range[0]) / self.dz)
         
         # Bounds check
-        i = np.clip(i, 1, self.nx - 2)
-        j = np.clip(j, 1, self.ny - 2)
-        k = np.clip(k, 1, self.nz - 2) if self.dimensionality == 3 else 0
+        i = min(max(i, 1), self.nx - 2)
+        j = min(max(j, 1), self.ny - 2)
+        k = min(max(k, 1), self.nz - 2) if self.dimensionality == 3 else 0
         
         # Central difference for gradient
         grad_x = (C[i+1, j, k] - C[i-1, j, k]) / (2 * self.dx)
@@ -348,17 +424,113 @@ class Microenvironment:
             grad_z = (C[i, j, k+1] - C[i, j, k-1]) / (2 * self.dz)
             return np.array([grad_x, grad_y, grad_z])
     
+    def get_gradients_at(self, substrate_names: Tuple[str, ...], position: Tuple[float, ...]) -> np.ndarray:
+        """
+        Compute the gradients of several substrates at one position.
+        
+        Args:
+            substrate_names: Names of substrates (missing ones give zero gradient)
+            position: (x, y) or (x, y, z) in microns
+            
+        Returns:
+            Array of shape (len(substrate_names), dimensionality)
+        """
+        indices = [self.substrate_index(name) for name in substrate_names]
+        return self.sample_gradients(indices, position)
+    
+    def sample_gradients(self, substrate_indices, position: Tuple[float, ...]) -> np.ndarray:
+        """
+        Compute the gradients of several substrates, given by index, at one position.
+        
+        Matches get_gradient_at for each substrate, but the central differences
+        are computed once for the whole grid per diffusion step, so each call
+        is a single index lookup. Index -1 (a missing substrate) selects an
+        all-zero field kept at the end of the stack.
+        
+        Args:
+            substrate_indices: Indices from substrate_index()
+            position: (x, y) or (x, y, z) in microns
+            
+        Returns:
+            Array of shape (len(substrate_indices), dimensionality)
+        """
+        if self._gradient_stack is None:
+            self._gradient_stack = self._compute_gradient_stack()
+        fields = self._gradient_stack
+        
+        # Same clipped indices as get_gradient_at, offset into the interior grid
+        i = min(max(int((position[0] - self.x_range[0]) / self.dx), 1), self.nx - 2) - 1
+        j = min(max(int((position[1] - self.y_range[0]) / self.dy), 1), self.ny - 2) - 1
+        
+        if self.dimensionality == 2:
+            return fields[substrate_indices, i, j]
+        k = min(max(int((position[2] - self.z_range[0]) / self.dz), 1), self.nz - 2) - 1
+        return fields[substrate_indices, i, j, k]
+    
+    def _compute_gradient_stack(self) -> np.ndarray:
+        """Central-difference gradients on interior voxels for every substrate, plus a zero field."""
+        if self.dimensionality == 2:
+            interior = (self.nx - 2, self.ny - 2)
+        else:
+            interior = (self.nx - 2, self.ny - 2, self.nz - 2)
+        fields = np.zeros((len(self.substrates) + 1,) + interior + (self.dimensionality,), dtype=np.float32)
+        
+        for name, substrate in self.substrates.items():
+            s = self.substrate_indices[name]
+            C = substrate.concentration
+            if self.dimensionality == 2:
+                fields[s, ..., 0] = (C[2:, 1:-1, 0] - C[:-2, 1:-1, 0]) / (2 * self.dx)
+                fields[s, ..., 1] = (C[1:-1, 2:, 0] - C[1:-1, :-2, 0]) / (2 * self.dy)
+            else:
+                fields[s, ..., 0] = (C[2:, 1:-1, 1:-1] - C[:-2, 1:-1, 1:-1]) / (2 * self.dx)
+                fields[s, ..., 1] = (C[1:-1, 2:, 1:-1] - C[1:-1, :-2, 1:-1]) / (2 * self.dy)
+                fields[s, ..., 2] = (C[1:-1, 1:-1, 2:] - C[1:-1, 1:-1, :-2]) / (2 * self.dz)
+        
+        return fields
+    
     def position_to_voxel(self, position: Tuple[float, ...]) -> Tuple[int, ...]:
-        """Convert continuous position (µm) to voxel indices."""
+        """
+        Convert continuous position (µm) to voxel indices.
+        
+        Accepts any indexable position, including a NumPy row view, so callers
+        do not need to build a tuple first.
+        """
         i = int((position[0] - self.x_range[0]) / self.dx)
         j = int((position[1] - self.y_range[0]) / self.dy)
         k = 0 if self.dimensionality == 2 else int((position[2] - self.z_range[0]) / self.dz)
         
         # Bounds check
-        i = np.clip(i, 0, self.nx - 1)
-        j = np.clip(j, 0, self.ny - 1)
-        k = np.clip(k, 0, self.nz - 1)
+        i = min(max(i, 0), self.nx - 1)
+        j = min(max(j, 0), self.ny - 1)
+        k = min(max(k, 0), self.nz - 1)
+        
+        return (i, j, k)
+    
+    def positions_to_voxels(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Vectorized position_to_voxel for many positions.
         
+        Args:
+            positions: (N, 2) or (N, 3) array of positions in microns
+            
+        Returns:
+            (N, 3) array of voxel indices
+        """
+        positions = np.asarray(positions, dtype=float)
+        voxels = np.zeros((len(positions), 3), dtype=np.intp)
+        if len(positions) == 0:
+            return voxels
+        voxels[:, 0] = np.clip(((positions[:, 0] - self.x_range[0]) / self.dx).astype(np.intp), 0, self.nx - 1)
+        voxels[:, 1] = np.clip(((positions[:, 1] - self.y_range[0]) / self.dy).astype(np.intp), 0, self.ny - 1)
+        if self.dimensionality != 2:
+            voxels[:, 2] = np.clip(((positions[:, 2] - self.z_range[0]) / self.dz).astype(np.intp), 0, self.nz - 1)
+        return voxels
+    
+    def position_to_voxel_xy(self, x: float, y: float) -> Tuple[int, int, int]:
+        """Convert an (x, y) position (µm) on the z = 0 plane to voxel indices."""
+        i = min(max(int((x - self.x_range[0]) / self.dx), 0), self.nx - 1)
+        j = min(max(int((y - self.y_range[0]) / self.dy), 0), self.ny - 1)
+        k = 0 if self.dimensionality == 2 else min(max(int(-self.z_range[0] / self.dz), 0), self.nz - 1)
         return (i, j, k)
     
     def voxel_to_position(self, voxel: Tuple[int, ...]) -> Tuple[float, ...]:
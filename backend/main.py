@@ -19,7 +19,7 @@ sys.path.insert(0, current_dir)
 
 # Import modules directly from current directory
 from simulation import SimpleForagingModel
-from nanobot_simulation import TumorNanobotModel
+from nanobot_simulation import TumorNanobotModel, NanobotAgent
 from tumor_environment import CellPhase
 from schemas import (
     SimulationConfig, SimulationResult, StepState, AntState, 
@@ -633,10 +633,11 @@ async def run_tumor_simulation(config: TumorSimulationConfig):
             print(f"[TUMOR SIM] Step {step_num + 1}/{config.max_steps}")
             model.step()
             
-            # Create nanobot states
-            nanobots_state = [nanobot.to_dict() for nanobot in model.nanobots]
+            # Create nanobot states from one column-wise snapshot
+            snapshot = {key: column.tolist() for key, column in model.snapshot_nanobots().items()}
             nanobots_state = [
-                NanobotState(**nb) for nb in nanobots_state
+                NanobotState(**dict(zip(snapshot, fields)))
+                for fields in zip(*snapshot.values())
             ]
             
             # Capture detailed state periodically
@@ -646,10 +647,14 @@ async def run_tumor_simulation(config: TumorSimulationConfig):
             if capture_detail:
                 substrate_data = convert_substrate_maps(model)
                 
-            # Include all living tumor cell states at every step
+            # Include all living tumor cell states at every step, from one
+            # column-wise snapshot
+            snapshot = {
+                key: column.tolist() for key, column in model.geometry.snapshot_living_cells().items()
+            }
             tumor_cells_state = [
-                TumorCellState(**cell.to_dict())
-                for cell in model.geometry.get_living_cells()
+                TumorCellState(**dict(zip(snapshot, fields)))
+                for fields in zip(*snapshot.values())
             ]
             
             # Create step state
@@ -799,10 +804,11 @@ async def compare_tumor_strategies(config: TumorComparisonConfig):
             
             # If not using pheromones, disable chemotaxis to pheromones
             if not use_pheromones:
+                no_pheromone_weights = NanobotAgent.CHEMOTAXIS_WEIGHTS.copy()
+                for name in ('trail', 'alarm', 'recruitment'):
+                    no_pheromone_weights[NanobotAgent.CHEMOTAXIS_SUBSTRATES.index(name)] = 0.0
                 for nanobot in model.nanobots:
-                    nanobot.chemotaxis_weights['trail'] = 0.0
-                    nanobot.chemotaxis_weights['alarm'] = 0.0
-                    nanobot.chemotaxis_weights['recruitment'] = 0.0
+                    nanobot.chemotaxis_weights = no_pheromone_weights
             
             for _ in range(steps):
                 model.step()
@@ -12,20 +12,35 @@ Key adaptations:
 - Alarm pheromones → Toxicity or navigation failures
 """
 
+import asyncio
+import json
+import math
 import numpy as np
-import random
 from typing import Dict, List, Tuple, Optional
 from enum import Enum
+import httpx
 import openai
 import os
 from dotenv import load_dotenv
 import threading
+import queue
+import heapq
+import time
+import weakref
+from collections import OrderedDict
+from scipy.spatial import cKDTree
 from biofvm import Microenvironment
-from tumor_environment import TumorGeometry, TumorCell, VesselPoint, CellPhase, CellType
+from tumor_environment import (
+    TumorGeometry, TumorCell, VesselPoint, ImmuneCell, CellPhase, CellType,
+    PHASE_CODES, CELL_TYPES
+)
 
 load_dotenv()
 IO_API_KEY = os.getenv("IO_SECRET_KEY")
 
+# Verbose per-report blockchain logging (off by default; the reports are frequent)
+DEBUG_BLOCKCHAIN = os.getenv("DEBUG_BLOCKCHAIN", "").lower() in ("1", "true", "yes")
+
 # Blockchain integration
 try:
     # Add parent directory to path to find blockchain module
@@ -45,6 +60,87 @@ except Exception as e:
     print(f"[NANOBOT] ⚠️ Blockchain disabled: {e}")
 
 
+# Substrates sampled for a nanobot's LLM decision context, in prompt order
+LLM_CONTEXT_SUBSTRATES = (
+    'oxygen', 'drug', 'trail', 'alarm',
+    'ifn_gamma', 'tnf_alpha', 'perforin',
+    'drug_a', 'drug_b'
+)
+
+# Actions a nanobot LLM may choose
+LLM_ACTIONS = ('target', 'follow_trail', 'explore', 'return')
+
+# Maximum number of per-nanobot LLM requests in flight at once
+LLM_MAX_CONCURRENT_REQUESTS = 32
+
+# Connection pool of the async LLM client: enough keep-alive connections
+# for every concurrent request, so bursts reuse warm TLS connections
+LLM_MAX_CONNECTIONS = 64
+LLM_MAX_KEEPALIVE_CONNECTIONS = LLM_MAX_CONCURRENT_REQUESTS
+
+# Maximum number of memoized LLM decisions kept per model
+LLM_DECISION_CACHE_SIZE = 4096
+
+# Steps a memoized LLM decision stays valid, so behaviour follows the
+# slowly drifting environment instead of freezing on early answers
+LLM_DECISION_CACHE_TTL = 50
+
+# Radius (µm) of the neighbourhood described to a nanobot's LLM
+LLM_CONTEXT_RADIUS = 50.0
+
+# Prompt describing a nanobot's situation to its LLM; filled from the
+# fields returned by NanobotAgent._describe_situation_for_llm()
+LLM_SITUATION_TEMPLATE = """You are an intelligent nanobot carrying anti-cancer drugs through a complex tumor microenvironment.
+
+CURRENT STATUS:
+- Position: ({x:.1f}, {y:.1f}) µm
+- Drug payload: {drug_payload:.1f}/{max_payload} units
+- Deliveries made: {deliveries_made}
+
+LOCAL MICROENVIRONMENT:
+- Oxygen: {oxygen:.2f} mmHg (low = hypoxic tumor region, good target)
+- Drug concentration: {drug:.2f} (already treated area?)
+- Trail pheromone: {trail:.2f} (successful delivery paths)
+- Alarm pheromone: {alarm:.2f} (problems/toxicity reported)
+
+IMMUNE SYSTEM SIGNALS:
+- IFN-gamma: {ifn_gamma:.2f} (T-cell activity, enhances immune response)
+- TNF-alpha: {tnf_alpha:.2f} (macrophage activity, pro-inflammatory)
+- Perforin: {perforin:.2f} (NK cell activity, cytotoxic)
+
+MULTI-DRUG THERAPY:
+- Drug A: {drug_a:.2f} (primary therapeutic agent)
+- Drug B: {drug_b:.2f} (secondary/synergistic agent)
+
+TUMOR CELL ANALYSIS (within 50µm):
+- Total cells: {n_cells}
+- Stem cells: {stem_cell} (highly resistant, need more drug)
+- Differentiated: {differentiated} (normal sensitivity)
+- Resistant: {resistant} (developed resistance)
+- Invasive: {invasive} (more sensitive)
+- Average resistance level: {avg_resistance:.2f} (0=no resistance, 1=fully resistant)
+
+IMMUNE CELL ACTIVITY:
+- Active immune cells nearby: {n_immune}
+- Average activation: {immune_activity:.2f} (0=inactive, 1=fully active)
+
+BLOOD-BRAIN BARRIER:
+- Nearest vessel BBB permeability: {bbb_permeability:.2f} (0.05=very restrictive, 0.3=leaky tumor vessels)
+
+STRATEGIC CONSIDERATIONS:
+- Stem cells require 3x more drug than regular cells
+- Immune cells make tumor cells more vulnerable to drugs
+- High resistance areas need sustained drug delivery
+- BBB restricts drug transport (only {bbb_percent:.0f}% passes through)
+- Multi-drug combinations can overcome resistance
+
+ACTIONS:
+- 'target': Lock onto specific tumor cell (prioritize stem cells if payload sufficient)
+- 'follow_trail': Follow pheromone trail to known effective areas
+- 'explore': Use chemotaxis to find new targets (avoid high resistance areas)
+- 'return': Return to vessel to reload (especially if near BBB vessels)"""
+
+
 class NanobotState(Enum):
     """States a nanobot can be in."""
     SEARCHING = "searching"      # Looking for hypoxic tumor regions
@@ -54,14 +150,288 @@ class NanobotState(Enum):
     RELOADING = "reloading"      # At vessel, refilling drug
 
 
+# Number of recent positions each nanobot keeps in its move history
+MOVE_HISTORY_LENGTH = 500
+
+# uint8 codes for NanobotState in the model's swarm arrays
+NANOBOT_STATES = tuple(NanobotState)
+STATE_CODES = {state: code for code, state in enumerate(NANOBOT_STATES)}
+
+
+INTEL_PIN_NAMES = {
+    0: "HYPOXIC_CLUSTER",
+    1: "STEM_CELL_DETECTED",
+    2: "HIGH_RESISTANCE",
+    3: "IMMUNE_ACTIVE",
+    4: "SUCCESSFUL_KILL",
+    5: "TARGET_ACQUIRED",
+    6: "DRUG_DELIVERY"
+}
+
+
+class _BlockchainReporter(threading.Thread):
+    """
+    Background sender for nanobot intel reports.
+    
+    Nanobots only enqueue (nanobot_id, pin_type, x, y, priority) tuples. This
+    thread drains the queue every flush interval and sends up to batch_size
+    pins per transaction via TumorIntel.reportIntelBatch, so the simulation
+    step never waits on RPC round-trips. Contracts deployed before the batch
+    function existed (checked against the deployment at startup) get one
+    reportIntel transaction per pin instead.
+    
+    Sent transactions are handed to the pending-tx queue without waiting for
+    a receipt; _PendingTxMonitor confirms them.
+    
+    Chain id and account balance are read once at startup. The gas price is
+    cached for gas_price_ttl seconds and refetched early after a failed send.
+    """
+    
+    _STOP = object()
+    
+    def __init__(
+        self,
+        intel_queue: queue.Queue,
+        pending_txs: queue.Queue,
+        flush_interval: float = 1.5,
+        batch_size: int = 20,
+        gas_price_ttl: float = 30.0
+    ):
+        super().__init__(name="tumor-intel-reporter", daemon=True)
+        self.intel_queue = intel_queue
+        self.pending_txs = pending_txs
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.gas_price_ttl = gas_price_ttl
+        
+        # Only this thread sends transactions, so it owns the nonce
+        self.nonce = w3.eth.get_transaction_count(acct.address)
+        self.chain_id = w3.eth.chain_id  # Immutable for the lifetime of the connection
+        self.gas_price = None
+        self.gas_price_fetched_at = 0.0
+        self.supports_batch = self._detect_batch_support()
+        
+        # Checked once here rather than before every report
+        try:
+            if w3.eth.get_balance(acct.address) == 0:
+                print("[BLOCKCHAIN] ⚠️ Reporter account has 0 ETH; intel transactions will likely fail")
+        except Exception as e:
+            print(f"[BLOCKCHAIN] ⚠️ Could not check reporter account balance: {e}")
+    
+    def stop(self):
+        """Flush pending reports and end the thread."""
+        self.intel_queue.put(self._STOP)
+    
+    @staticmethod
+    def _detect_batch_support() -> bool:
+        """
+        Check that the deployed contract, not just the local ABI, has reportIntelBatch.
+        
+        The ABI comes from the local build artifacts while the address comes
+        from the environment, so an older deployment can match an ABI that
+        lists the function. An empty batch is a no-op on contracts that have
+        it and reverts on ones that do not.
+        """
+        if not hasattr(tumor_intel_contract.functions, 'reportIntelBatch'):
+            return False
+        try:
+            tumor_intel_contract.functions.reportIntelBatch([], [], [], []).call({'from': acct.address})
+            return True
+        except Exception as e:
+            print(f"[BLOCKCHAIN] ⚠️ Deployed TumorIntel has no usable reportIntelBatch ({type(e).__name__}); "
+                  f"sending one reportIntel transaction per pin")
+            return False
+    
+    def run(self):
+        stopping = False
+        while not stopping:
+            pins = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(pins) < self.batch_size:
+                try:
+                    item = self.intel_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                pins.append(item)
+            
+            if pins:
+                self._send(pins)
+    
+    def _send(self, pins: List[Tuple[int, int, int, int, int]]):
+        """Send one batch of pins, logging (not raising) on failure."""
+        try:
+            now = time.monotonic()
+            if self.gas_price is None or now - self.gas_price_fetched_at > self.gas_price_ttl:
+                self.gas_price = w3.eth.gas_price
+                self.gas_price_fetched_at = now
+            
+            if self.supports_batch:
+                _, pin_types, xs, ys, priorities = zip(*pins)
+                call = tumor_intel_contract.functions.reportIntelBatch(
+                    list(xs), list(ys), list(pin_types), list(priorities)
+                )
+                tx_hash = self._submit(call, gas=60000 + 120000 * len(pins))
+                self.pending_txs.put((tx_hash, [self._describe(pin) for pin in pins]))
+                tx_count = 1
+            else:
+                for pin in pins:
+                    _, pin_type, x, y, priority = pin
+                    call = tumor_intel_contract.functions.reportIntel(x, y, pin_type, priority)
+                    tx_hash = self._submit(call, gas=200000)
+                    self.pending_txs.put((tx_hash, [self._describe(pin)]))
+                tx_count = len(pins)
+            
+            if DEBUG_BLOCKCHAIN:
+                print(f"[BLOCKCHAIN] 📤 Submitted {len(pins)} intel pins in {tx_count} transaction(s)")
+                
+        except Exception as e:
+            print(f"[BLOCKCHAIN] ❌ Failed to report {len(pins)} intel pins: {type(e).__name__}: {e}")
+            # Refetch the gas price next time (underpriced / insufficient-funds errors)
+            self.gas_price = None
+            # Resync in case a transaction was rejected after the nonce was used
+            try:
+                self.nonce = w3.eth.get_transaction_count(acct.address, 'pending')
+            except Exception:
+                pass
+    
+    def _submit(self, call, gas: int):
+        """Build, sign and send one contract call; returns the tx hash immediately."""
+        txn = call.build_transaction({
+            'from': acct.address,
+            'nonce': self.nonce,
+            'gas': gas,
+            'gasPrice': self.gas_price,
+            'chainId': self.chain_id,
+        })
+        signed = acct.sign_transaction(txn)
+        tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
+        self.nonce += 1
+        return tx_hash
+    
+    @staticmethod
+    def _describe(pin: Tuple[int, int, int, int, int]) -> str:
+        nanobot_id, pin_type, x, y, _ = pin
+        pin_name = INTEL_PIN_NAMES.get(pin_type, f"UNKNOWN_{pin_type}")
+        return f"Nanobot {nanobot_id}: {pin_name} at ({x}, {y})"
+
+
+class _PendingTxMonitor(threading.Thread):
+    """
+    Background poller for submitted intel transactions.
+    
+    Takes (tx_hash, descriptions) items from the pending-tx queue and polls
+    their receipts with exponential backoff, appending the outcome of each
+    report to the model's blockchain logs.
+    """
+    
+    _STOP = object()
+    
+    def __init__(
+        self,
+        pending_txs: queue.Queue,
+        logs: List[str],
+        initial_delay: float = 2.0,
+        max_delay: float = 30.0,
+        timeout: float = 300.0
+    ):
+        super().__init__(name="tumor-intel-tx-monitor", daemon=True)
+        self.pending_txs = pending_txs
+        self.logs = logs
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+    
+    def stop(self):
+        """End the thread; transactions still pending are not waited for."""
+        self.pending_txs.put(self._STOP)
+    
+    def run(self):
+        # Heap of (next_check, delay, give_up_at, seq, tx_hash, descriptions)
+        pending = []
+        seq = 0
+        while True:
+            wait = max(0.0, pending[0][0] - time.monotonic()) if pending else None
+            try:
+                items = [self.pending_txs.get(timeout=wait)]
+            except queue.Empty:
+                items = []
+            # Drain whatever else is queued without blocking, so a steady
+            # stream of new transactions cannot starve the receipt polling
+            while items:
+                try:
+                    items.append(self.pending_txs.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for item in items:
+                if item is self._STOP:
+                    return
+                tx_hash, descriptions = item
+                now = time.monotonic()
+                heapq.heappush(pending, (now + self.initial_delay, self.initial_delay, now + self.timeout, seq, tx_hash, descriptions))
+                seq += 1
+            
+            now = time.monotonic()
+            while pending and pending[0][0] <= now:
+                _, delay, give_up_at, tx_seq, tx_hash, descriptions = heapq.heappop(pending)
+                try:
+                    receipt = w3.eth.get_transaction_receipt(tx_hash)
+                except Exception:
+                    receipt = None  # Not mined yet (or transient RPC error)
+                
+                if receipt is not None:
+                    status = "" if receipt.status == 1 else " [reverted]"
+                    for description in descriptions:
+                        self.logs.append(f"{description} - tx: {tx_hash.hex()[:10]}...{status}")
+                    if DEBUG_BLOCKCHAIN or status:
+                        print(f"[BLOCKCHAIN] ✅ Transaction mined{status}: https://sepolia.basescan.org/tx/{tx_hash.hex()}")
+                elif now >= give_up_at:
+                    print(f"[BLOCKCHAIN] ⚠️ No receipt after {self.timeout:.0f}s for tx {tx_hash.hex()}")
+                else:
+                    delay = min(delay * 2, self.max_delay)
+                    heapq.heappush(pending, (now + delay, delay, give_up_at, tx_seq, tx_hash, descriptions))
+
+
 class NanobotAgent:
     """
     A single nanobot agent that navigates the tumor microenvironment.
     
     Adapted from SimpleAntAgent in simulation.py, but now operates in
     continuous space with chemotaxis toward substrate gradients.
+    
+    Position, previous direction, drug payload and state live in the model's
+    swarm arrays; the agent holds row views into them and exposes the scalar
+    fields as properties.
     """
     
+    __slots__ = (
+        'nanobot_id', 'model', 'is_llm_controlled', 'position',
+        'max_payload', 'speed',
+        'chemotaxis_weights', 'target_cell', 'target_vessel',
+        'deliveries_made', 'total_drug_delivered', 'api_calls',
+        'move_history', 'history_steps', 'previous_direction', 'pending_action'
+    )
+    
+    # Substrates each nanobot climbs (or descends), in model.chemotaxis_indices order
+    CHEMOTAXIS_SUBSTRATES = (
+        'oxygen', 'trail', 'alarm', 'recruitment', 'chemokine_signal', 'toxicity_signal'
+    )
+    
+    # Default chemotaxis weights (how much each gradient influences movement).
+    # Shared by every nanobot and read-only; assign a new array to override.
+    CHEMOTAXIS_WEIGHTS = np.array([
+        -1.0,  # oxygen: Move TOWARD low oxygen (hypoxic tumor)
+        0.8,   # trail: Follow successful delivery trails
+        -0.5,  # alarm: Avoid alarm pheromones
+        0.6,   # recruitment: Respond to recruitment signals
+        1.2,   # chemokine_signal: Strong attraction to "come here" signals
+        -1.5,  # toxicity_signal: Strong repulsion from "stay away" signals
+    ], dtype=np.float32)
+    CHEMOTAXIS_WEIGHTS.setflags(write=False)
+    
     def __init__(
         self,
         nanobot_id: int,
@@ -72,23 +442,27 @@ class NanobotAgent:
         self.model = model
         self.is_llm_controlled = is_llm_controlled
         
+        # Views into the model's swarm arrays (always update in place)
+        self.position = model.positions[nanobot_id]
+        self.previous_direction = model.previous_directions[nanobot_id]  # Movement inertia
+        
         # Start near a random vessel
         if model.geometry.vessels:
-            start_vessel = random.choice(model.geometry.vessels)
+            start_vessel = model.geometry.vessels[model._rng.integers(len(model.geometry.vessels))]
             # Add small random offset
-            offset = np.random.randn(2) * 20.0  # 20 µm std dev
-            self.position = np.array([
+            offset = model._rng.standard_normal(2) * 20.0  # 20 µm std dev
+            self.position[:] = (
                 start_vessel.position[0] + offset[0],
                 start_vessel.position[1] + offset[1],
                 0.0  # 2D for now
-            ])
+            )
         else:
             # Random position if no vessels
-            self.position = np.array([
-                np.random.uniform(model.microenv.x_range[0], model.microenv.x_range[1]),
-                np.random.uniform(model.microenv.y_range[0], model.microenv.y_range[1]),
+            self.position[:] = (
+                model._rng.uniform(model.microenv.x_range[0], model.microenv.x_range[1]),
+                model._rng.uniform(model.microenv.y_range[0], model.microenv.y_range[1]),
                 0.0
-            ])
+            )
         
         # Nanobot properties (medically realistic values)
         self.state = NanobotState.SEARCHING
@@ -96,15 +470,8 @@ class NanobotAgent:
         self.max_payload = 20.0   # 20 μg total capacity (effective for simulation)
         self.speed = 30.0  # µm per step (movement speed)
         
-        # Chemotaxis weights (how much each gradient influences movement)
-        self.chemotaxis_weights = {
-            'oxygen': -1.0,           # Move TOWARD low oxygen (hypoxic tumor)
-            'trail': 0.8,             # Follow successful delivery trails
-            'alarm': -0.5,            # Avoid alarm pheromones
-            'recruitment': 0.6,       # Respond to recruitment signals
-            'chemokine_signal': 1.2,  # Strong attraction to "come here" signals
-            'toxicity_signal': -1.5,  # Strong repulsion from "stay away" signals
-        }
+        # Chemotaxis weights, ordered as CHEMOTAXIS_SUBSTRATES
+        self.chemotaxis_weights = NanobotAgent.CHEMOTAXIS_WEIGHTS
         
         # Target tracking
         self.target_cell: Optional[TumorCell] = None
@@ -114,20 +481,39 @@ class NanobotAgent:
         self.deliveries_made = 0
         self.total_drug_delivered = 0.0
         self.api_calls = 0
-        self.move_history: List[Tuple[float, float]] = []
+        # Ring buffer of recent (x, y) positions; read it through get_history()
+        self.move_history = np.empty((MOVE_HISTORY_LENGTH, 2), dtype=np.float32)
+        self.history_steps = 0
         
-        # Movement inertia for smoother navigation
-        self.previous_direction = np.zeros(2)
+        # LLM decision prefetched by the model for this step (if any)
+        self.pending_action: Optional[str] = None
         
-    def step(self, guidance: Optional[Dict] = None):
+    @property
+    def state(self) -> NanobotState:
+        return NANOBOT_STATES[self.model.nanobot_states[self.nanobot_id]]
+    
+    @state.setter
+    def state(self, value: NanobotState):
+        self.model.nanobot_states[self.nanobot_id] = STATE_CODES[value]
+    
+    @property
+    def drug_payload(self) -> float:
+        return float(self.model.drug_payloads[self.nanobot_id])
+    
+    @drug_payload.setter
+    def drug_payload(self, value: float):
+        self.model.drug_payloads[self.nanobot_id] = value
+    
+    def step(self, guidance: Optional[Tuple[np.ndarray, np.ndarray]] = None):
         """
         Execute one timestep of nanobot behavior.
         
         Args:
-            guidance: Optional guidance from Queen nanobot
+            guidance: Optional (directions, has_guidance) buffers from Queen nanobot
         """
         # Record position history
-        self.move_history.append(tuple(self.position[:2]))
+        self.move_history[self.history_steps % MOVE_HISTORY_LENGTH] = self.position[:2]
+        self.history_steps += 1
         
         # State machine
         if self.state == NanobotState.RELOADING:
@@ -140,8 +526,44 @@ class NanobotAgent:
             self._move_toward_target()
         else:  # SEARCHING
             self._search_for_target(guidance)
+        
+        # A prefetched decision is only valid for the step it was made for
+        self.pending_action = None
+    
+    def _guided_direction(self, guidance: Optional[Tuple[np.ndarray, np.ndarray]]) -> Optional[np.ndarray]:
+        """Return the Queen's direction for this nanobot, or None if it has none."""
+        if guidance is None:
+            return None
+        directions, has_guidance = guidance
+        if not has_guidance[self.nanobot_id]:
+            return None
+        return directions[self.nanobot_id]
     
-    def _search_for_target(self, guidance: Optional[Dict] = None):
+    def needs_llm_decision(self, guidance: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> bool:
+        """
+        Check whether this step will reach the LLM branch of the search.
+        
+        Mirrors the early exits in _search_for_target so the model can
+        prefetch decisions only for nanobots that will actually use them.
+        """
+        if not (self.is_llm_controlled and self.model.io_client and self.model.api_enabled):
+            return False
+        if self.state != NanobotState.SEARCHING:
+            return False
+        if self._guided_direction(guidance) is not None:
+            return False
+        if self.drug_payload > 2.0 and self._find_nearest_living_cell(max_distance=100.0):
+            return False
+        return True
+    
+    def get_history(self) -> np.ndarray:
+        """Recent (x, y) positions, oldest first (at most MOVE_HISTORY_LENGTH)."""
+        if self.history_steps <= MOVE_HISTORY_LENGTH:
+            return self.move_history[:self.history_steps].copy()
+        start = self.history_steps % MOVE_HISTORY_LENGTH
+        return np.concatenate((self.move_history[start:], self.move_history[:start]))
+    
+    def _search_for_target(self, guidance: Optional[Tuple[np.ndarray, np.ndarray]] = None):
         """
         Search for tumor cells to target.
         Prioritizes nearest living cell for drug delivery.
@@ -162,17 +584,18 @@ class NanobotAgent:
             return
         
         # Check if we have guidance from Queen
-        if guidance and self.nanobot_id in guidance:
-            guided_direction = guidance[self.nanobot_id]
-            self.position += guided_direction * self.speed
+        guided_direction = self._guided_direction(guidance)
+        if guided_direction is not None:
+            self.position[:2] += guided_direction * self.speed
             self._clamp_position()
             return
         
         # LLM-based decision making
         if self.is_llm_controlled and self.model.io_client and self.model.api_enabled:
             try:
-                action = self._ask_llm_for_decision()
-                self.api_calls += 1
+                action = self.pending_action
+                if action is None:
+                    action = self._ask_llm_for_decision()
                 
                 if action == "target":
                     # Try to lock onto nearby hypoxic cell
@@ -184,53 +607,57 @@ class NanobotAgent:
                 elif action == "follow_trail":
                     # Follow pheromone trail
                     direction = self._compute_pheromone_direction()
-                    if np.linalg.norm(direction) > 0:
-                        direction = direction / np.linalg.norm(direction)
-                        self.position += direction * self.speed
+                    norm = math.hypot(direction[0], direction[1])
+                    if norm > 0:
+                        direction = direction / norm
+                        self.position[:2] += direction * self.speed
                         self._clamp_position()
                         return
                 # "explore" or other → use chemotaxis
             except Exception as e:
                 self.model.log_error(f"Nanobot {self.nanobot_id} LLM call failed: {str(e)}")
                 # Deposit alarm pheromone on error
-                voxel = self.model.microenv.position_to_voxel(tuple(self.position))
+                voxel = self.model.microenv.position_to_voxel_xy(self.position[0], self.position[1])
                 alarm = self.model.microenv.get_substrate('alarm')
                 if alarm:
                     alarm.add_source(voxel, 5.0)
         
         # Default behavior: chemotaxis-based movement with inertia and stochasticity
         direction = self._compute_chemotaxis_direction()
-        if np.linalg.norm(direction) > 0:
-            direction = direction / np.linalg.norm(direction)
+        norm = math.hypot(direction[0], direction[1])
+        if norm > 0:
+            direction = direction / norm
             
             # Add inertia: blend new direction with previous direction (70% new, 30% old)
             inertial_direction = 0.7 * direction + 0.3 * self.previous_direction
             
             # Add stochasticity: small random noise to break oscillation loops
-            random_vector = np.random.randn(2) * 0.1
-            final_direction = inertial_direction + random_vector
+            final_direction = inertial_direction + self.model.step_noise[self.nanobot_id]
             
             # Normalize and apply movement
-            if np.linalg.norm(final_direction) > 0:
-                final_direction = final_direction / np.linalg.norm(final_direction)
+            norm = math.hypot(final_direction[0], final_direction[1])
+            if norm > 0:
+                final_direction = final_direction / norm
             
             self.position[:2] += final_direction * self.speed
-            self.previous_direction = final_direction
+            self.previous_direction[:] = final_direction
         else:
             # Random walk if no gradient, but stay within tumor
             if self._is_within_tumor_boundary():
-                angle = np.random.uniform(0, 2 * np.pi)
-                random_direction = np.array([np.cos(angle), np.sin(angle)])
-                self.position[0] += self.speed * random_direction[0]
-                self.position[1] += self.speed * random_direction[1]
-                self.previous_direction = random_direction
+                angle = self.model.step_angles[self.nanobot_id]
+                cos_a, sin_a = math.cos(angle), math.sin(angle)
+                self.position[0] += self.speed * cos_a
+                self.position[1] += self.speed * sin_a
+                self.previous_direction[:] = (cos_a, sin_a)
             else:
                 # Move toward tumor center if outside
-                tumor_center = np.array(self.model.geometry.center[:2])
-                direction_to_center = tumor_center - self.position[:2]
-                direction_to_center = direction_to_center / np.linalg.norm(direction_to_center)
+                direction_to_center = np.array([
+                    self.model.tumor_center_x - self.position[0],
+                    self.model.tumor_center_y - self.position[1]
+                ])
+                direction_to_center = direction_to_center / math.hypot(direction_to_center[0], direction_to_center[1])
                 self.position[:2] += direction_to_center * self.speed
-                self.previous_direction = direction_to_center
+                self.previous_direction[:] = direction_to_center
         
         self._clamp_position()
     
@@ -241,26 +668,13 @@ class NanobotAgent:
         Returns:
             Direction vector (not normalized)
         """
-        total_direction = np.zeros(2)
-        
-        for substrate_name, weight in self.chemotaxis_weights.items():
-            substrate = self.model.microenv.get_substrate(substrate_name)
-            if substrate:
-                gradient = self.model.microenv.get_gradient_at(substrate_name, tuple(self.position))
-                total_direction += weight * gradient[:2]
-        
-        return total_direction
+        gradients = self.model.microenv.sample_gradients(self.model.chemotaxis_indices, self.position)
+        return self.chemotaxis_weights @ gradients[:, :2]
     
     def _compute_pheromone_direction(self) -> np.ndarray:
         """Compute direction based only on pheromone trails."""
-        direction = np.zeros(2)
-        
-        trail = self.model.microenv.get_substrate('trail')
-        if trail:
-            gradient = self.model.microenv.get_gradient_at('trail', tuple(self.position))
-            direction = gradient[:2]
-        
-        return direction
+        gradient = self.model.microenv.get_gradients_at(('trail',), self.position)[0]
+        return gradient[:2]
     
     def _find_nearest_hypoxic_cell(self, max_distance: float = 150.0) -> Optional[TumorCell]:
         """
@@ -272,46 +686,15 @@ class NanobotAgent:
         Returns:
             Nearest hypoxic TumorCell or None
         """
-        hypoxic_cells = [
-            cell for cell in self.model.geometry.get_living_cells()
-            if cell.phase == CellPhase.HYPOXIC
-        ]
-        
-        if not hypoxic_cells:
-            return None
+        target_cell = self._nearest_cell_in_tumor(max_distance, phase=CellPhase.HYPOXIC)
         
-        # Filter cells to only those within tumor boundary
-        tumor_center = np.array(self.model.geometry.center[:2])
-        tumor_radius = self.model.geometry.tumor_radius
-        
-        valid_cells = []
-        for cell in hypoxic_cells:
-            cell_pos = np.array(cell.position[:2])
-            distance_from_center = np.linalg.norm(cell_pos - tumor_center)
-            if distance_from_center <= tumor_radius:
-                valid_cells.append(cell)
-        
-        if not valid_cells:
-            return None
-        
-        # Calculate distances to valid cells only
-        distances = [
-            np.linalg.norm(np.array(cell.position[:2]) - self.position[:2])
-            for cell in valid_cells
-        ]
-        
-        min_dist = min(distances) if distances else float('inf')
-        if min_dist <= max_distance:
-            target_cell = valid_cells[distances.index(min_dist)]
-            
+        if target_cell:
             # Report hypoxic cluster discovery to blockchain
             pin_type = 0  # HYPOXIC_CLUSTER
             priority = 8 if target_cell.cell_type == CellType.STEM_CELL else 6
             self._report_intel_to_blockchain(pin_type, target_cell.position[0], target_cell.position[1], priority)
-            
-            return target_cell
         
-        return None
+        return target_cell
     
     def _find_nearest_living_cell(self, max_distance: float = 150.0) -> Optional[TumorCell]:
         """
@@ -323,37 +706,43 @@ class NanobotAgent:
         Returns:
             Nearest living TumorCell or None
         """
-        living_cells = self.model.geometry.get_living_cells()
-        
-        if not living_cells:
-            return None
-        
-        # Filter cells to only those within tumor boundary
-        tumor_center = np.array(self.model.geometry.center[:2])
-        tumor_radius = self.model.geometry.tumor_radius
+        return self._nearest_cell_in_tumor(max_distance)
+    
+    def _nearest_cell_in_tumor(
+        self,
+        max_distance: float,
+        phase: Optional[CellPhase] = None
+    ) -> Optional[TumorCell]:
+        """
+        Nearest living cell (optionally in a given phase) inside the tumor boundary.
         
-        valid_cells = []
-        for cell in living_cells:
-            cell_pos = np.array(cell.position[:2])
-            distance_from_center = np.linalg.norm(cell_pos - tumor_center)
-            if distance_from_center <= tumor_radius:
-                valid_cells.append(cell)
+        Distances are computed in one vectorized pass over the model's cell
+        arrays. The arrays are a per-step snapshot, so the winning cell is
+        re-checked against the live object in case it died earlier this step.
+        """
+        model = self.model
+        model.refresh_cell_arrays()
         
-        if not valid_cells:
+        mask = model.cells_alive & model.cells_in_tumor
+        if phase is not None:
+            mask &= model.cells_phase == PHASE_CODES[phase]
+        if not mask.any():
             return None
         
-        # Calculate distances to valid cells only
-        distances = [
-            np.linalg.norm(np.array(cell.position[:2]) - self.position[:2])
-            for cell in valid_cells
-        ]
-        
-        min_dist = min(distances) if distances else float('inf')
-        if min_dist <= max_distance:
-            target_cell = valid_cells[distances.index(min_dist)]
-            return target_cell
-        
-        return None
+        diff = model.cells_xy - self.position[:2]
+        d2 = np.einsum('ij,ij->i', diff, diff)
+        d2[~mask] = np.inf
+        
+        cells = model.geometry.tumor_cells
+        max_d2 = max_distance * max_distance
+        while True:
+            idx = int(d2.argmin())
+            if d2[idx] > max_d2:
+                return None
+            cell = cells[idx]
+            if cell.is_alive and (phase is None or cell.phase == phase):
+                return cell
+            d2[idx] = np.inf
     
     def _move_toward_target(self):
         """Move toward locked target cell."""
@@ -363,15 +752,15 @@ class NanobotAgent:
             self.state = NanobotState.SEARCHING
             return
         
-        target_pos = np.array(self.target_cell.position[:2])
-        direction = target_pos - self.position[:2]
-        distance = np.linalg.norm(direction)
+        dx = self.target_cell.position[0] - self.position[0]
+        dy = self.target_cell.position[1] - self.position[1]
+        distance = math.hypot(dx, dy)
         
         if distance < 30.0:  # Close enough to deliver (increased from 15µm to 30µm for better reach)
             self.state = NanobotState.DELIVERING
         else:
-            direction = direction / distance
-            self.position[:2] += direction * self.speed
+            self.position[0] += dx / distance * self.speed
+            self.position[1] += dy / distance * self.speed
             self._clamp_position()
     
     def _report_intel_to_blockchain(self, pin_type: int, x: float, y: float, priority: int):
@@ -383,63 +772,17 @@ class NanobotAgent:
             x, y: Coordinates in micrometers
             priority: Priority level (1-10)
         """
-        if not BLOCKCHAIN_ENABLED:
-            print(f"[NANOBOT {self.nanobot_id}] ⚠️ Blockchain not enabled globally")
-            return
-            
-        if not self.model.blockchain_enabled:
-            print(f"[NANOBOT {self.nanobot_id}] ⚠️ Blockchain not enabled in model")
+        if not BLOCKCHAIN_ENABLED or not self.model.blockchain_enabled:
+            if DEBUG_BLOCKCHAIN:
+                print(f"[NANOBOT {self.nanobot_id}] ⚠️ Blockchain not enabled, intel not reported")
             return
         
-        pin_type_names = {
-            0: "HYPOXIC_CLUSTER",
-            1: "STEM_CELL_DETECTED",
-            2: "HIGH_RESISTANCE",
-            3: "IMMUNE_ACTIVE",
-            4: "SUCCESSFUL_KILL",
-            5: "TARGET_ACQUIRED",
-            6: "DRUG_DELIVERY"
-        }
-        pin_name = pin_type_names.get(pin_type, f"UNKNOWN_{pin_type}")
-        
-        print(f"[NANOBOT {self.nanobot_id}] 🔄 Attempting blockchain report: {pin_name} at ({int(x)}, {int(y)}) priority={priority}")
+        if DEBUG_BLOCKCHAIN:
+            pin_name = INTEL_PIN_NAMES.get(pin_type, f"UNKNOWN_{pin_type}")
+            print(f"[NANOBOT {self.nanobot_id}] 🔄 Queued blockchain report: {pin_name} at ({int(x)}, {int(y)}) priority={priority}")
         
-        try:
-            # Use centralized nonce manager to prevent conflicts
-            with self.model.nonce_lock:
-                nonce = self.model.current_nonce
-                self.model.current_nonce += 1
-            
-            gas_price = w3.eth.gas_price
-            
-            print(f"[NANOBOT {self.nanobot_id}]   Building transaction: nonce={nonce}, gas_price={gas_price}")
-            
-            txn = tumor_intel_contract.functions.reportIntel(
-                int(x), int(y), pin_type, priority
-            ).build_transaction({
-                'from': acct.address,
-                'nonce': nonce,
-                'gas': 200000,
-                'gasPrice': gas_price,
-            })
-            
-            print(f"[NANOBOT {self.nanobot_id}]   Signing transaction...")
-            
-            # Sign and send
-            signed = acct.sign_transaction(txn)
-            tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
-            
-            print(f"[NANOBOT {self.nanobot_id}] ✅ Intel reported to blockchain!")
-            print(f"[NANOBOT {self.nanobot_id}]   Transaction: https://sepolia.basescan.org/tx/{tx_hash.hex()}")
-            
-            # Add to model's blockchain logs
-            if hasattr(self.model, 'blockchain_logs'):
-                self.model.blockchain_logs.append(f"Nanobot {self.nanobot_id}: {pin_name} at ({int(x)}, {int(y)}) - tx: {tx_hash.hex()[:10]}...")
-                
-        except Exception as e:
-            print(f"[NANOBOT {self.nanobot_id}] ❌ Failed to report intel: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
+        # Sent in batches by the model's background reporter thread
+        self.model.intel_queue.put_nowait((self.nanobot_id, pin_type, int(x), int(y), priority))
     
     def _deliver_drug(self):
         """Deliver drug payload to target cell."""
@@ -449,7 +792,7 @@ class NanobotAgent:
             return
         
         # Release drug into microenvironment at this location
-        voxel = self.model.microenv.position_to_voxel(tuple(self.position))
+        voxel = self.model.microenv.position_to_voxel_xy(self.position[0], self.position[1])
         drug = self.model.microenv.get_substrate('drug')
         
         if drug and self.drug_payload > 0:
@@ -491,7 +834,7 @@ class NanobotAgent:
         # If payload depleted, return to vessel
         if self.drug_payload < 2.0:  # Return when < 2 μg remaining
             self.target_cell = None
-            self.target_vessel = self.model.geometry.find_nearest_vessel(tuple(self.position))
+            self.target_vessel = self.model.geometry.find_nearest_vessel(self.position)
             self.state = NanobotState.RETURNING
         else:
             # Continue delivering to same target
@@ -500,22 +843,22 @@ class NanobotAgent:
     def _return_to_vessel(self):
         """Navigate back to nearest vessel to reload."""
         if not self.target_vessel:
-            self.target_vessel = self.model.geometry.find_nearest_vessel(tuple(self.position))
+            self.target_vessel = self.model.geometry.find_nearest_vessel(self.position)
         
         if not self.target_vessel:
             # No vessels available, just search
             self.state = NanobotState.SEARCHING
             return
         
-        vessel_pos = np.array(self.target_vessel.position[:2])
-        direction = vessel_pos - self.position[:2]
-        distance = np.linalg.norm(direction)
+        dx = self.target_vessel.position[0] - self.position[0]
+        dy = self.target_vessel.position[1] - self.position[1]
+        distance = math.hypot(dx, dy)
         
         if distance < 10.0:  # At vessel
             self.state = NanobotState.RELOADING
         else:
-            direction = direction / distance
-            self.position[:2] += direction * self.speed
+            self.position[0] += dx / distance * self.speed
+            self.position[1] += dy / distance * self.speed
             self._clamp_position()
     
     def _reload_drug(self):
@@ -528,217 +871,234 @@ class NanobotAgent:
             self.state = NanobotState.SEARCHING
     
     def _clamp_position(self):
-        """Keep nanobot within simulation boundaries and tumor constraints."""
-        # First, clamp to simulation domain
-        self.position[0] = np.clip(
-            self.position[0],
-            self.model.microenv.x_range[0],
-            self.model.microenv.x_range[1]
-        )
-        self.position[1] = np.clip(
-            self.position[1],
-            self.model.microenv.y_range[0],
-            self.model.microenv.y_range[1]
-        )
-        
-        # CRITICAL: Enforce tumor boundary constraints
-        self._enforce_tumor_boundary()
-    
-    def _enforce_tumor_boundary(self):
         """
-        Enforce nanobot boundary constraints:
+        Keep nanobot within simulation boundaries and tumor constraints:
+        - Clamp to the simulation domain
         - Allow entry into tumor when targeting
         - Can leave tumor to go to blood vessels for reloading
         - Prevent wandering outside tumor when not on a mission
+        
+        Works on plain floats and writes the position back once.
         """
-        pos_2d = self.position[:2]
-        tumor_center = np.array(self.model.geometry.center[:2])
-        distance_from_center = np.linalg.norm(pos_2d - tumor_center)
-        
-        # Check if we're in a valid state to be outside tumor
-        can_be_outside = (
-            self.state == NanobotState.RETURNING or 
-            self.state == NanobotState.RELOADING or
-            self.drug_payload < 10.0  # Low on drugs, need to reload
-        )
+        model = self.model
+        x_range = model.microenv.x_range
+        y_range = model.microenv.y_range
+        px, py = self.position[:2].tolist()
         
-        # Allow entry when actively targeting (TARGETING or DELIVERING state)
-        is_actively_targeting = (
-            self.state == NanobotState.TARGETING or 
-            self.state == NanobotState.DELIVERING
-        )
+        # First, clamp to simulation domain
+        px = min(max(px, x_range[0]), x_range[1])
+        py = min(max(py, y_range[0]), y_range[1])
         
-        # If we're outside tumor boundary, decide what to do
-        if distance_from_center > self.model.geometry.tumor_radius:
+        # CRITICAL: Enforce tumor boundary constraints
+        cx, cy = model.tumor_center_x, model.tumor_center_y
+        tumor_radius = model.tumor_radius
+        offset_x, offset_y = px - cx, py - cy
+        
+        # If we're outside tumor boundary, decide what to do (squared
+        # comparison; the distance itself is only needed out there)
+        if offset_x * offset_x + offset_y * offset_y > tumor_radius * tumor_radius:
+            distance_from_center = math.hypot(offset_x, offset_y)
+            state = self.state
+            
+            # Allow entry when actively targeting (TARGETING or DELIVERING state)
+            is_actively_targeting = (
+                state == NanobotState.TARGETING or 
+                state == NanobotState.DELIVERING
+            )
+            
             # Allow entry if actively targeting a cell inside tumor
             if is_actively_targeting and self.target_cell:
                 # Check if target is inside tumor - if so, allow crossing boundary
-                target_pos = np.array(self.target_cell.position[:2])
-                target_distance_from_center = np.linalg.norm(target_pos - tumor_center)
-                if target_distance_from_center <= self.model.geometry.tumor_radius:
+                target_dx = self.target_cell.position[0] - cx
+                target_dy = self.target_cell.position[1] - cy
+                if target_dx * target_dx + target_dy * target_dy <= tumor_radius * tumor_radius:
                     # Target is inside tumor, allow nanobot to enter
+                    self.position[0] = px
+                    self.position[1] = py
                     return  # Don't constrain movement
             
+            # Check if we're in a valid state to be outside tumor
+            can_be_outside = (
+                state == NanobotState.RETURNING or 
+                state == NanobotState.RELOADING or
+                self.drug_payload < 10.0  # Low on drugs, need to reload
+            )
+            
             # Not actively targeting or target is outside tumor
             if not can_be_outside and not is_actively_targeting:
                 # Force nanobot back toward tumor center only if not on a mission
-                direction_to_center = tumor_center - pos_2d
-                if np.linalg.norm(direction_to_center) > 0:
-                    direction_to_center = direction_to_center / np.linalg.norm(direction_to_center)
+                if distance_from_center > 0:
                     # Move toward tumor boundary edge
-                    edge_position = tumor_center + direction_to_center * (self.model.geometry.tumor_radius - 5.0)
-                    self.position[0] = edge_position[0]
-                    self.position[1] = edge_position[1]
+                    edge_distance = tumor_radius - 5.0
+                    px, py = (
+                        cx + (cx - px) / distance_from_center * edge_distance,
+                        cy + (cy - py) / distance_from_center * edge_distance
+                    )
                     
                     # Cancel targeting if forced back
                     if self.target_cell:
                         self.target_cell = None
                         self.state = NanobotState.SEARCHING
-            elif self.state == NanobotState.RETURNING:
+            elif state == NanobotState.RETURNING:
                 # We're allowed to be outside (returning to vessel)
-                nearest_vessel = self.model.geometry.find_nearest_vessel(tuple(self.position))
+                self.position[0] = px
+                self.position[1] = py
+                nearest_vessel = model.geometry.find_nearest_vessel(self.position)
                 if nearest_vessel:
-                    vessel_pos = np.array(nearest_vessel.position[:2])
-                    vessel_distance = np.linalg.norm(pos_2d - vessel_pos)
+                    dx = nearest_vessel.position[0] - px
+                    dy = nearest_vessel.position[1] - py
+                    vessel_distance = math.hypot(dx, dy)
                     
                     # If we're far from any vessel, redirect toward nearest one
                     if vessel_distance > 100.0:  # 100 µm threshold
-                        direction_to_vessel = vessel_pos - pos_2d
-                        direction_to_vessel = direction_to_vessel / np.linalg.norm(direction_to_vessel)
-                        self.position[:2] += direction_to_vessel * self.speed * 0.5
+                        px += dx / vessel_distance * self.speed * 0.5
+                        py += dy / vessel_distance * self.speed * 0.5
+        
+        self.position[0] = px
+        self.position[1] = py
     
     def _is_within_tumor_boundary(self) -> bool:
         """Check if nanobot is within the tumor boundary (red area)."""
-        pos_2d = self.position[:2]
-        tumor_center = np.array(self.model.geometry.center[:2])
-        distance_from_center = np.linalg.norm(pos_2d - tumor_center)
-        return distance_from_center <= self.model.geometry.tumor_radius
+        model = self.model
+        dx = self.position[0] - model.tumor_center_x
+        dy = self.position[1] - model.tumor_center_y
+        return dx * dx + dy * dy <= model.tumor_radius * model.tumor_radius
     
     def _ask_llm_for_decision(self) -> str:
         """
         Query LLM for high-level strategy decision with advanced biological context.
         
+        Decisions are memoized on the model under a discretized view of the
+        local situation, so nanobots in practically identical surroundings
+        reuse an earlier answer instead of making another API call.
+        api_calls is only incremented when the API is actually called.
+        
         Returns:
             Action string: 'target', 'follow_trail', 'explore', 'return'
         """
-        # Get local environmental information
-        oxygen = self.model.microenv.get_concentration_at('oxygen', tuple(self.position))
-        drug = self.model.microenv.get_concentration_at('drug', tuple(self.position))
-        trail = self.model.microenv.get_concentration_at('trail', tuple(self.position))
-        alarm = self.model.microenv.get_concentration_at('alarm', tuple(self.position))
-        
-        # Get immune system signals
-        ifn_gamma = self.model.microenv.get_concentration_at('ifn_gamma', tuple(self.position))
-        tnf_alpha = self.model.microenv.get_concentration_at('tnf_alpha', tuple(self.position))
-        perforin = self.model.microenv.get_concentration_at('perforin', tuple(self.position))
-        
-        # Get multi-drug concentrations
-        drug_a = self.model.microenv.get_concentration_at('drug_a', tuple(self.position))
-        drug_b = self.model.microenv.get_concentration_at('drug_b', tuple(self.position))
-        
-        # Analyze nearby tumor cells by type
-        nearby_cells = [
-            c for c in self.model.geometry.get_living_cells()
-            if np.linalg.norm(np.array(c.position[:2]) - self.position[:2]) < 50.0
-        ]
-        
-        cell_type_counts = {}
-        avg_resistance = 0.0
-        stem_cells_nearby = 0
+        decision_key, fields = self._describe_situation_for_llm()
+        cached_action = self.model.cached_llm_decision(decision_key)
+        if cached_action is not None:
+            return cached_action
+        return self._ask_llm_for_described_decision(decision_key, LLM_SITUATION_TEMPLATE.format_map(fields))
+    
+    def _ask_llm_for_described_decision(self, decision_key: Tuple, situation: str) -> str:
+        """
+        Query the LLM for an already described, uncached situation and
+        memoize the answer under decision_key.
+        """
+        try:
+            self.api_calls += 1
+            response = self.model.io_client.chat.completions.create(
+                **self._llm_decision_request(situation)
+            )
+        except Exception as e:
+            return 'explore'  # Not cached, so the next similar situation retries
         
-        if nearby_cells:
-            for cell_type in CellType:
-                cell_type_counts[cell_type.value] = len([
-                    c for c in nearby_cells if c.cell_type == cell_type
-                ])
-            avg_resistance = np.mean([c.resistance_level for c in nearby_cells])
-            stem_cells_nearby = cell_type_counts.get('stem_cell', 0)
+        return self._accept_llm_decision(decision_key, response)
+    
+    async def _ask_llm_for_decision_async(self, decision_key: Tuple, situation: str) -> str:
+        """
+        Async counterpart of _ask_llm_for_described_decision, using the
+        model's AsyncOpenAI client.
+        """
+        try:
+            self.api_calls += 1
+            response = await self.model.io_async_client.chat.completions.create(
+                **self._llm_decision_request(situation)
+            )
+        except Exception as e:
+            return 'explore'  # Not cached, so the next similar situation retries
         
-        # Analyze nearby immune cells
-        nearby_immune = [
-            c for c in self.model.geometry.immune_cells
-            if c.is_active and np.linalg.norm(np.array(c.position[:2]) - self.position[:2]) < 50.0
-        ]
+        return self._accept_llm_decision(decision_key, response)
+    
+    def _llm_decision_request(self, situation: str) -> Dict:
+        """Chat completion arguments for a single-nanobot decision."""
+        return dict(
+            model=self.model.selected_model,
+            messages=[
+                {"role": "system", "content": "You are an intelligent nanobot. Respond with one word: target, follow_trail, explore, or return."},
+                {"role": "user", "content": situation + "\n\nWhat should you do? Respond with ONE word only."}
+            ],
+            temperature=0.3,
+            max_completion_tokens=10,
+            timeout=10
+        )
+    
+    def _accept_llm_decision(self, decision_key: Tuple, response) -> str:
+        """Validate a single-nanobot LLM response and memoize the action."""
+        action = response.choices[0].message.content.strip().lower()
+        action = action if action in LLM_ACTIONS else 'explore'
+        self.model.cache_llm_decision(decision_key, action)
+        return action
+    
+    def _describe_situation_for_llm(self, context: Optional[Dict] = None) -> Tuple[Tuple, Dict]:
+        """
+        Describe this nanobot's local situation for an LLM decision.
         
-        immune_activity = np.mean([c.activation_level for c in nearby_immune]) if nearby_immune else 0.0
+        Args:
+            context: This nanobot's entry from model.llm_contexts(), if already
+                gathered for the whole swarm; gathered on demand otherwise
         
-        # Check BBB permeability of nearest vessel
-        nearest_vessel = self.model.geometry.find_nearest_vessel(tuple(self.position))
-        bbb_permeability = nearest_vessel.bbb_permeability if nearest_vessel else 0.1
+        Returns:
+            (decision_key, fields) - the discretized memo key and the values
+            that fill LLM_SITUATION_TEMPLATE; the prompt text itself is only
+            rendered for situations that miss the decision cache
+        """
+        if context is None:
+            context = self.model.llm_contexts([self])[0]
+        
+        # Local environmental information, immune system signals and
+        # multi-drug concentrations
+        (
+            oxygen, drug, trail, alarm,
+            ifn_gamma, tnf_alpha, perforin,
+            drug_a, drug_b
+        ) = context['readings']
+        
+        # Nearby tumor cells by type
+        cell_type_counts = context['cell_type_counts']
+        avg_resistance = context['avg_resistance']
+        stem_cells_nearby = cell_type_counts.get('stem_cell', 0)
+        
+        # Nearby immune cells and BBB permeability of the nearest vessel
+        immune_activity = context['immune_activity']
+        bbb_permeability = context['bbb_permeability']
+        
+        decision_key = (
+            round(oxygen, 1), round(drug, 1), round(trail, 1), round(alarm, 1),
+            round(ifn_gamma, 1), round(tnf_alpha, 1), round(perforin, 1),
+            round(drug_a, 1), round(drug_b, 1),
+            tuple(cell_type_counts.values()), round(avg_resistance, 2),
+            context['n_immune'], round(immune_activity, 1),
+            round(bbb_permeability, 2), round(self.drug_payload)
+        )
         
-        prompt = f"""You are an intelligent nanobot carrying anti-cancer drugs through a complex tumor microenvironment.
-
-CURRENT STATUS:
-- Position: ({self.position[0]:.1f}, {self.position[1]:.1f}) µm
-- Drug payload: {self.drug_payload:.1f}/{self.max_payload} units
-- Deliveries made: {self.deliveries_made}
-
-LOCAL MICROENVIRONMENT:
-- Oxygen: {oxygen:.2f} mmHg (low = hypoxic tumor region, good target)
-- Drug concentration: {drug:.2f} (already treated area?)
-- Trail pheromone: {trail:.2f} (successful delivery paths)
-- Alarm pheromone: {alarm:.2f} (problems/toxicity reported)
-
-IMMUNE SYSTEM SIGNALS:
-- IFN-gamma: {ifn_gamma:.2f} (T-cell activity, enhances immune response)
-- TNF-alpha: {tnf_alpha:.2f} (macrophage activity, pro-inflammatory)
-- Perforin: {perforin:.2f} (NK cell activity, cytotoxic)
-
-MULTI-DRUG THERAPY:
-- Drug A: {drug_a:.2f} (primary therapeutic agent)
-- Drug B: {drug_b:.2f} (secondary/synergistic agent)
-
-TUMOR CELL ANALYSIS (within 50µm):
-- Total cells: {len(nearby_cells)}
-- Stem cells: {stem_cells_nearby} (highly resistant, need more drug)
-- Differentiated: {cell_type_counts.get('differentiated', 0)} (normal sensitivity)
-- Resistant: {cell_type_counts.get('resistant', 0)} (developed resistance)
-- Invasive: {cell_type_counts.get('invasive', 0)} (more sensitive)
-- Average resistance level: {avg_resistance:.2f} (0=no resistance, 1=fully resistant)
-
-IMMUNE CELL ACTIVITY:
-- Active immune cells nearby: {len(nearby_immune)}
-- Average activation: {immune_activity:.2f} (0=inactive, 1=fully active)
-
-BLOOD-BRAIN BARRIER:
-- Nearest vessel BBB permeability: {bbb_permeability:.2f} (0.05=very restrictive, 0.3=leaky tumor vessels)
-
-STRATEGIC CONSIDERATIONS:
-- Stem cells require 3x more drug than regular cells
-- Immune cells make tumor cells more vulnerable to drugs
-- High resistance areas need sustained drug delivery
-- BBB restricts drug transport (only {bbb_permeability*100:.0f}% passes through)
-- Multi-drug combinations can overcome resistance
-
-ACTIONS:
-- 'target': Lock onto specific tumor cell (prioritize stem cells if payload sufficient)
-- 'follow_trail': Follow pheromone trail to known effective areas
-- 'explore': Use chemotaxis to find new targets (avoid high resistance areas)
-- 'return': Return to vessel to reload (especially if near BBB vessels)
-
-What should you do? Respond with ONE word only."""
-
-        try:
-            response = self.model.io_client.chat.completions.create(
-                model=self.model.selected_model,
-                messages=[
-                    {"role": "system", "content": "You are an intelligent nanobot. Respond with one word: target, follow_trail, explore, or return."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_completion_tokens=10,
-                timeout=10
-            )
-            action = response.choices[0].message.content.strip().lower()
-            return action if action in ['target', 'follow_trail', 'explore', 'return'] else 'explore'
-        except Exception as e:
-            return 'explore'
+        fields = {
+            'x': self.position[0], 'y': self.position[1],
+            'drug_payload': self.drug_payload, 'max_payload': self.max_payload,
+            'deliveries_made': self.deliveries_made,
+            'oxygen': oxygen, 'drug': drug, 'trail': trail, 'alarm': alarm,
+            'ifn_gamma': ifn_gamma, 'tnf_alpha': tnf_alpha, 'perforin': perforin,
+            'drug_a': drug_a, 'drug_b': drug_b,
+            'n_cells': context['n_cells'],
+            'stem_cell': stem_cells_nearby,
+            'differentiated': cell_type_counts.get('differentiated', 0),
+            'resistant': cell_type_counts.get('resistant', 0),
+            'invasive': cell_type_counts.get('invasive', 0),
+            'avg_resistance': avg_resistance,
+            'n_immune': context['n_immune'],
+            'immune_activity': immune_activity,
+            'bbb_permeability': bbb_permeability,
+            'bbb_percent': bbb_permeability * 100,
+        }
+        return decision_key, fields
     
     def to_dict(self) -> Dict:
         """Convert nanobot to dictionary for serialization."""
         return {
             'id': self.nanobot_id,
-            'position': tuple(self.position[:2]),
+            'position': tuple(self.position[:2].tolist()),
             'state': self.state.value,
             'drug_payload': self.drug_payload,
             'deliveries_made': self.deliveries_made,
@@ -760,51 +1120,61 @@ class QueenNanobot:
         self.model = model
         self.use_llm = use_llm
         
-    def guide(self) -> Dict[int, np.ndarray]:
+        # Guidance buffers reused across calls (row i belongs to nanobot i)
+        n_nanobots = len(model.nanobots)
+        self.directions = np.zeros((n_nanobots, 2), dtype=np.float32)
+        self.has_guidance = np.zeros(n_nanobots, dtype=bool)
+        
+        # Tumor summary at the last successful LLM consultation; the LLM is
+        # only asked again once it changes
+        self._last_llm_signature: Optional[Tuple[int, int, int, int]] = None
+        
+    def guide(self) -> Tuple[np.ndarray, np.ndarray]:
         """
         Provide strategic guidance to nanobots.
         
         Returns:
-            Dictionary mapping nanobot_id to direction vector
+            (directions, has_guidance): unit direction per nanobot and a mask of
+            which rows were set by this call. Both buffers are overwritten on the
+            next call.
         """
+        self.has_guidance.fill(False)
+        
         if self.use_llm and self.model.io_client and self.model.api_enabled:
-            return self._guide_with_llm()
+            self._guide_with_llm()
         else:
-            return self._guide_with_heuristic()
+            self._guide_with_heuristic()
+        
+        return self.directions, self.has_guidance
     
-    def _guide_with_heuristic(self) -> Dict[int, np.ndarray]:
+    def _set_guidance(self, nanobot_id: int, direction: np.ndarray):
+        """Write a unit direction for one nanobot into the guidance buffers."""
+        self.directions[nanobot_id] = direction
+        self.has_guidance[nanobot_id] = True
+    
+    def _guide_with_heuristic(self):
         """Simple heuristic guidance based on tumor statistics."""
-        guidance = {}
-        
         # Find regions with high hypoxic cell density
         hypoxic_cells = self.model.geometry.get_cells_in_phase(CellPhase.HYPOXIC)
         
         if not hypoxic_cells:
-            return guidance
+            return
         
-        # Direct nanobots toward hypoxic regions
-        for nanobot in self.model.nanobots:
-            if nanobot.state == NanobotState.SEARCHING and nanobot.drug_payload > 20.0:
-                # Find nearest hypoxic cell
-                distances = [
-                    np.linalg.norm(np.array(cell.position[:2]) - nanobot.position[:2])
-                    for cell in hypoxic_cells
-                ]
-                
-                if distances:
-                    nearest_cell = hypoxic_cells[np.argmin(distances)]
-                    direction = np.array(nearest_cell.position[:2]) - nanobot.position[:2]
-                    distance = np.linalg.norm(direction)
-                    
-                    if distance > 0:
-                        guidance[nanobot.nanobot_id] = direction / distance
+        hypoxic_xy = np.array([cell.position[:2] for cell in hypoxic_cells], dtype=np.float32)
         
-        return guidance
+        # Direct nanobots toward hypoxic regions
+        for nanobot_id in self.model.guidable_nanobot_ids():
+            # Find nearest hypoxic cell (squared distances preserve the ordering)
+            offsets = hypoxic_xy - self.model.positions[nanobot_id, :2]
+            nearest = int(np.argmin(np.einsum('ij,ij->i', offsets, offsets)))
+            dx, dy = offsets[nearest].tolist()
+            distance = math.hypot(dx, dy)
+            
+            if distance > 0:
+                self._set_guidance(nanobot_id, (dx / distance, dy / distance))
     
-    def _guide_with_llm(self) -> Dict[int, np.ndarray]:
+    def _guide_with_llm(self):
         """LLM-based strategic guidance with advanced biological context."""
-        guidance = {}
-        
         # Get comprehensive tumor statistics
         stats = self.model.geometry.get_tumor_statistics()
         
@@ -827,6 +1197,16 @@ class QueenNanobot:
             if immune_cell.is_active and immune_cell.activation_level > 0.7:
                 immune_active_regions.append(immune_cell.position[:2])
         
+        # The LLM's analysis only feeds the enhanced heuristic, so skip the
+        # API call while the tumor picture is unchanged
+        signature = (
+            stats['living_cells'], len(stem_cell_regions),
+            len(high_resistance_regions), len(immune_active_regions)
+        )
+        if signature == self._last_llm_signature:
+            self._guide_with_enhanced_heuristic(stem_cell_regions, high_resistance_regions, immune_active_regions)
+            return
+        
         # Create strategic prompt for Queen
         prompt = f"""You are the Queen nanobot coordinating a swarm of {len(self.model.nanobots)} nanobots in a complex tumor microenvironment.
 
@@ -880,56 +1260,61 @@ Provide guidance for nanobot positioning and targeting priorities."""
             # Parse response and convert to guidance vectors
             # For now, use enhanced heuristic based on the analysis
             print(f"[TUMOR MODEL] ✅ Queen LLM guidance successful")
-            return self._guide_with_enhanced_heuristic(stem_cell_regions, high_resistance_regions, immune_active_regions)
+            self._last_llm_signature = signature
+            self._guide_with_enhanced_heuristic(stem_cell_regions, high_resistance_regions, immune_active_regions)
             
         except Exception as e:
             print(f"[TUMOR MODEL] Queen LLM guidance failed: {e}")
             self.model.log_error(f"Queen LLM guidance failed: {str(e)}")
-            return self._guide_with_heuristic()
+            self._guide_with_heuristic()
     
-    def _guide_with_enhanced_heuristic(self, stem_regions, resistance_regions, immune_regions) -> Dict[int, np.ndarray]:
+    def _guide_with_enhanced_heuristic(self, stem_regions, resistance_regions, immune_regions):
         """Enhanced heuristic guidance using advanced biological analysis."""
-        guidance = {}
+        # Priority 1: Stem cell regions (highest priority)
+        # Priority 2: Immune-active regions (synergistic opportunities)
+        # Priority 3: High resistance regions (need sustained treatment)
+        priority_tiers = (
+            (3.0, stem_regions),
+            (2.0, immune_regions),
+            (1.5, resistance_regions),
+        )
         
-        for nanobot in self.model.nanobots:
-            if nanobot.state == NanobotState.SEARCHING and nanobot.drug_payload > 20.0:
-                best_direction = None
-                best_priority = 0
-                
-                # Priority 1: Stem cell regions (highest priority)
-                for stem_pos in stem_regions:
-                    direction = np.array(stem_pos) - nanobot.position[:2]
-                    distance = np.linalg.norm(direction)
-                    if distance > 0:
-                        priority = 3.0 / (distance + 1)  # Higher priority for closer stem cells
-                        if priority > best_priority:
-                            best_direction = direction / distance
-                            best_priority = priority
-                
-                # Priority 2: Immune-active regions (synergistic opportunities)
-                for immune_pos in immune_regions:
-                    direction = np.array(immune_pos) - nanobot.position[:2]
-                    distance = np.linalg.norm(direction)
-                    if distance > 0:
-                        priority = 2.0 / (distance + 1)
-                        if priority > best_priority:
-                            best_direction = direction / distance
-                            best_priority = priority
-                
-                # Priority 3: High resistance regions (need sustained treatment)
-                for res_pos in resistance_regions:
-                    direction = np.array(res_pos) - nanobot.position[:2]
-                    distance = np.linalg.norm(direction)
-                    if distance > 0:
-                        priority = 1.5 / (distance + 1)
-                        if priority > best_priority:
-                            best_direction = direction / distance
-                            best_priority = priority
-                
-                if best_direction is not None:
-                    guidance[nanobot.nanobot_id] = best_direction
+        nanobot_ids = self.model.guidable_nanobot_ids()
+        if len(nanobot_ids) == 0:
+            return
+        
+        # Each tier's nearest region per nanobot comes from one KD-tree query
+        bot_xy = self.model.positions[nanobot_ids, :2].astype(float)
+        best_priority = np.zeros(len(nanobot_ids))
+        best_direction = np.zeros((len(nanobot_ids), 2))
+        
+        for weight, regions in priority_tiers:
+            if not regions:
+                continue
+            
+            region_xy = np.asarray(regions, dtype=float)
+            
+            # Priority decreases with distance, so each tier's nearest region
+            # is its best candidate. Ask for two neighbours so a region exactly
+            # under the nanobot can be skipped (missing neighbours are inf).
+            distances, indices = cKDTree(region_xy).query(bot_xy, k=2)
+            use_second = distances[:, 0] <= 0.0
+            nearest_distance = np.where(use_second, distances[:, 1], distances[:, 0])
+            nearest = np.where(use_second, indices[:, 1], indices[:, 0])
+            found = (nearest_distance > 0.0) & np.isfinite(nearest_distance)
+            
+            priority = np.zeros(len(nanobot_ids))
+            priority[found] = weight / (nearest_distance[found] + 1)  # Higher priority for closer regions
+            
+            better = priority > best_priority
+            best_priority[better] = priority[better]
+            best_direction[better] = (
+                (region_xy[nearest[better]] - bot_xy[better]) / nearest_distance[better, None]
+            )
         
-        return guidance
+        for i, nanobot_id in enumerate(nanobot_ids):
+            if best_priority[i] > 0:
+                self._set_guidance(nanobot_id, best_direction[i])
 
 
 class TumorNanobotModel:
@@ -949,7 +1334,8 @@ class TumorNanobotModel:
         agent_type: str = "LLM-Powered",
         with_queen: bool = False,
         use_llm_queen: bool = False,
-        selected_model: str = "meta-llama/Llama-3.3-70B-Instruct"
+        selected_model: str = "meta-llama/Llama-3.3-70B-Instruct",
+        seed: Optional[int] = None
     ):
         self.domain_size = domain_size
         self.voxel_size = voxel_size
@@ -957,6 +1343,14 @@ class TumorNanobotModel:
         self.with_queen = with_queen
         self.use_llm_queen = use_llm_queen
         
+        # Generator for the whole run: nanobot placement and movement noise, and
+        # (through a seed drawn from it) the tumor geometry. Without an explicit
+        # seed it is seeded from the global NumPy RNG, so np.random.seed()
+        # keeps runs reproducible.
+        if seed is None:
+            seed = int(np.random.randint(2**31))
+        self._rng = np.random.default_rng(seed)
+        
         # List of known supported chat models
         SUPPORTED_CHAT_MODELS = [
             'meta-llama/Llama-3.3-70B-Instruct',
@@ -1018,28 +1412,59 @@ class TumorNanobotModel:
             domain_size=domain_size,
             tumor_radius=tumor_radius,
             cell_density=0.001,
-            dimensionality=2
+            dimensionality=2,
+            seed=int(self._rng.integers(2**31))
+        )
+        
+        # Tumor boundary as plain floats for the per-bot scalar geometry checks
+        self.tumor_center_x = float(self.geometry.center[0])
+        self.tumor_center_y = float(self.geometry.center[1])
+        self.tumor_radius = float(self.geometry.tumor_radius)
+        
+        # Structure-of-arrays snapshot of the tumor cells for vectorized
+        # nearest-cell queries, refreshed at most once per step
+        self.cells_xy = np.zeros((0, 2), dtype=np.float32)
+        self.cells_alive = np.zeros(0, dtype=bool)
+        self.cells_phase = np.zeros(0, dtype=np.int8)
+        self.cells_in_tumor = np.zeros(0, dtype=bool)
+        self.cells_type = np.zeros(0, dtype=np.int8)
+        self.cells_resistance = np.zeros(0)
+        self.living_ids = np.zeros(0, dtype=np.intp)  # tumor_cells indices of living cells
+        self.living_tree: Optional[cKDTree] = None    # Over living cell positions, in living_ids order
+        self.immune_activation = np.zeros(0)          # Activation level of each active immune cell
+        self.immune_tree: Optional[cKDTree] = None    # Over active immune cell positions
+        self._cell_arrays_step = -1
+        
+        # Substrate indices for NanobotAgent.CHEMOTAXIS_SUBSTRATES, resolved once
+        self.chemotaxis_indices = np.array(
+            [self.microenv.substrate_index(name) for name in NanobotAgent.CHEMOTAXIS_SUBSTRATES],
+            dtype=np.intp
         )
         
         # Initialize nanobots
-        self.nanobots: List[NanobotAgent] = []
-        is_llm = agent_type == "LLM-Powered"
+        self._init_swarm(n_nanobots, agent_type)
+        self._llm_loop: Optional[asyncio.AbstractEventLoop] = None  # LLM request loop, created on first use
         
-        for i in range(n_nanobots):
-            if agent_type == "Hybrid":
-                is_llm = i < n_nanobots // 2
-            
-            nanobot = NanobotAgent(i, self, is_llm_controlled=is_llm)
-            self.nanobots.append(nanobot)
+        # LRU memo of LLM decisions keyed on a discretized local state
+        self.llm_decision_cache: "OrderedDict[Tuple, Tuple[str, int]]" = OrderedDict()  # key -> (action, step cached)
+        self._llm_cache_lock = threading.Lock()
         
         # Initialize errors list first (needed for log_error calls)
         self.errors: List[str] = []
         
         # Blockchain integration for decentralized swarm intelligence
         self.blockchain_enabled = BLOCKCHAIN_ENABLED
-        self.nonce_lock = threading.Lock()
+        self.blockchain_logs: List[str] = []
+        self.intel_queue: queue.Queue = queue.Queue()
+        self.pending_txs: queue.Queue = queue.Queue()
         if self.blockchain_enabled:
-            self.current_nonce = w3.eth.get_transaction_count(acct.address)
+            self.blockchain_reporter = _BlockchainReporter(self.intel_queue, self.pending_txs)
+            self.tx_monitor = _PendingTxMonitor(self.pending_txs, self.blockchain_logs)
+            self.blockchain_reporter.start()
+            self.tx_monitor.start()
+            # Flush and stop the background threads once the model is discarded
+            weakref.finalize(self, self.blockchain_reporter.stop)
+            weakref.finalize(self, self.tx_monitor.stop)
 
         self.nonce = 0
         # Initialize Queen
@@ -1047,16 +1472,28 @@ class TumorNanobotModel:
         
         # Initialize IO client
         self.api_enabled = False
+        self.io_async_client = None  # Used for concurrent per-nanobot decisions
         if IO_API_KEY:
             try:
                 self.io_client = openai.OpenAI(
                     api_key=IO_API_KEY,
                     base_url="https://api.intelligence.io.solutions/api/v1/"
                 )
+                self.io_async_client = openai.AsyncOpenAI(
+                    api_key=IO_API_KEY,
+                    base_url="https://api.intelligence.io.solutions/api/v1/",
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=LLM_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS
+                        )
+                    )
+                )
                 self.api_enabled = True
                 print("[TUMOR MODEL] LLM API initialized successfully")
             except Exception as e:
                 self.io_client = None
+                self.io_async_client = None
                 self.log_error(f"Failed to initialize LLM API: {str(e)}")
         else:
             self.io_client = None
@@ -1068,10 +1505,10 @@ class TumorNanobotModel:
             'total_deliveries': 0,
             'total_drug_delivered': 0.0,
             'cells_killed': 0,
-            'hypoxic_cells': len(self.geometry.get_cells_in_phase(CellPhase.HYPOXIC)),
-            'viable_cells': len(self.geometry.get_cells_in_phase(CellPhase.VIABLE)),
-            'necrotic_cells': len(self.geometry.get_cells_in_phase(CellPhase.NECROTIC)),
-            'apoptotic_cells': len(self.geometry.get_cells_in_phase(CellPhase.APOPTOTIC)),
+            'hypoxic_cells': self.geometry.count_cells_in_phase(CellPhase.HYPOXIC),
+            'viable_cells': self.geometry.count_cells_in_phase(CellPhase.VIABLE),
+            'necrotic_cells': self.geometry.count_cells_in_phase(CellPhase.NECROTIC),
+            'apoptotic_cells': self.geometry.count_cells_in_phase(CellPhase.APOPTOTIC),
             'total_api_calls': 0,
             # Add LLM vs rule-based metrics for frontend compatibility
             'food_collected_by_llm': 0,
@@ -1086,6 +1523,39 @@ class TumorNanobotModel:
         print(f"  Blood vessels: {len(self.geometry.vessels)}")
         print(f"  Nanobots: {len(self.nanobots)}")
     
+    def _init_swarm(self, n_nanobots: int, agent_type: str):
+        """Allocate the swarm state arrays and create the nanobot agents."""
+        # Structure-of-arrays swarm state; each NanobotAgent views its own row
+        # float32 is ample for µm-scale 2D geometry; drug mass stays float64
+        self.positions = np.zeros((n_nanobots, 3), dtype=np.float32)
+        self.previous_directions = np.zeros((n_nanobots, 2), dtype=np.float32)
+        self.drug_payloads = np.zeros(n_nanobots)
+        self.nanobot_states = np.zeros(n_nanobots, dtype=np.uint8)
+        self._draw_step_noise()
+        
+        self.nanobots: List[NanobotAgent] = []
+        is_llm = agent_type == "LLM-Powered"
+        
+        for i in range(n_nanobots):
+            if agent_type == "Hybrid":
+                is_llm = i < n_nanobots // 2
+            
+            nanobot = NanobotAgent(i, self, is_llm_controlled=is_llm)
+            self.nanobots.append(nanobot)
+    
+    def _draw_step_noise(self):
+        """Draw this step's movement noise for the whole swarm in two RNG calls."""
+        n_nanobots = len(self.positions)
+        self.step_noise = self._rng.standard_normal((n_nanobots, 2), dtype=np.float32)
+        self.step_noise *= 0.1
+        self.step_angles = self._rng.uniform(0.0, 2 * np.pi, size=n_nanobots)
+    
+    def guidable_nanobot_ids(self) -> np.ndarray:
+        """Ids of searching nanobots carrying enough payload to accept Queen guidance."""
+        return np.flatnonzero(
+            (self.nanobot_states == STATE_CODES[NanobotState.SEARCHING]) & (self.drug_payloads > 20.0)
+        )
+    
     def step(self):
         """Execute one simulation timestep."""
         self.step_count += 1
@@ -1103,14 +1573,22 @@ class TumorNanobotModel:
         self._apply_vessel_sources()
         
         # Get Queen guidance
-        guidance = {}
+        guidance = None
         if self.queen and self.step_count % 10 == 0:  # Queen acts every 10 steps
             try:
                 guidance = self.queen.guide()
             except Exception as e:
                 self.log_error(f"Queen guidance failed: {str(e)}")
         
+        # Query the LLM for all searching LLM nanobots in one batch
+        self._prefetch_llm_decisions(guidance)
+        
         # Update nanobots
+        self._draw_step_noise()
+        # LLM round-trips were already issued concurrently by
+        # _prefetch_llm_decisions, so what remains here is GIL-bound
+        # Python and kept serial: bots write shared pheromone/drug fields
+        # in id order and the run stays reproducible for a given seed
         for nanobot in self.nanobots:
             nanobot.step(guidance)
             if nanobot.is_llm_controlled:
@@ -1120,62 +1598,340 @@ class TumorNanobotModel:
         # Simulate microenvironment diffusion
         self.microenv.step()
         
+        # One log line for this step's nanobot delivery kills
+        drug_kills = self.geometry.pop_drug_kills()
+        if drug_kills:
+            print(f"[TUMOR CELL] {len(drug_kills)} cell(s) killed by nanobot proximity delivery this step")
+        
         # Update metrics
         self._update_metrics()
     
+    def refresh_cell_arrays(self):
+        """
+        Rebuild the tumor-cell arrays and immune-cell KD-tree if they are stale.
+        
+        Cell positions only change (and cells are only added) while tumor and
+        immune cells update at the start of a step, so one snapshot per step
+        is enough.
+        """
+        cells = self.geometry.tumor_cells
+        if self._cell_arrays_step == self.step_count and len(cells) == len(self.cells_alive):
+            return
+        
+        # Copies of the geometry's array store, frozen for the rest of the step
+        self.geometry.count_living_cells()  # Adopts any directly appended cells
+        arrays = self.geometry.cell_arrays
+        self.cells_xy = arrays.positions[:, :2].astype(np.float32)
+        self.cells_alive = arrays.alive.copy()
+        self.cells_phase = arrays.phases.copy()
+        self.cells_type = arrays.types.copy()
+        
+        self.cells_in_tumor = self.geometry.are_inside_tumor(arrays.positions)
+        
+        self.cells_resistance = arrays.resistance.copy()
+        
+        # KD-trees over living tumor cells and active immune cells for the
+        # short-range neighbourhood queries behind LLM contexts
+        self.living_ids = np.flatnonzero(self.cells_alive)
+        self.living_tree = cKDTree(self.cells_xy[self.living_ids]) if len(self.living_ids) else None
+        
+        active_immune = [c for c in self.geometry.immune_cells if c.is_active]
+        self.immune_activation = np.array([c.activation_level for c in active_immune], dtype=float)
+        self.immune_tree = cKDTree([c.position[:2] for c in active_immune]) if active_immune else None
+        
+        self._cell_arrays_step = self.step_count
+    
+    def llm_contexts(self, nanobots: List[NanobotAgent]) -> List[Dict]:
+        """
+        Gather the local context behind each nanobot's LLM decision prompt.
+        
+        Substrate readings, nearby tumor and immune cells and nearest vessels
+        are looked up for all nanobots at once, leaving only the prompt text
+        to be filled in per nanobot.
+        
+        Returns:
+            One dict per nanobot with 'readings' (LLM_CONTEXT_SUBSTRATES
+            concentrations), 'n_cells', 'cell_type_counts' (empty if no
+            cells), 'avg_resistance', 'n_immune', 'immune_activity' and
+            'bbb_permeability'
+        """
+        self.refresh_cell_arrays()
+        positions = self.positions[[nanobot.nanobot_id for nanobot in nanobots]]
+        readings = self.microenv.sample_batch(LLM_CONTEXT_SUBSTRATES, positions).T.tolist()
+        
+        # Strictly within the context radius
+        radius = np.nextafter(LLM_CONTEXT_RADIUS, 0.0)
+        no_neighbours = [[] for _ in nanobots]
+        cell_neighbours = (
+            self.living_tree.query_ball_point(positions[:, :2], radius)
+            if self.living_tree is not None else no_neighbours
+        )
+        immune_neighbours = (
+            self.immune_tree.query_ball_point(positions[:, :2], radius)
+            if self.immune_tree is not None else no_neighbours
+        )
+        vessels = self.geometry.vessels
+        vessel_ids = self.geometry.find_nearest_vessels(positions).tolist() if vessels else None
+        
+        contexts = []
+        for k in range(len(nanobots)):
+            nearby_ids = self.living_ids[cell_neighbours[k]]
+            cell_type_counts = {}
+            avg_resistance = 0.0
+            if len(nearby_ids):
+                type_counts = np.bincount(self.cells_type[nearby_ids], minlength=len(CELL_TYPES))
+                for cell_type, count in zip(CELL_TYPES, type_counts.tolist()):
+                    cell_type_counts[cell_type.value] = count
+                avg_resistance = float(self.cells_resistance[nearby_ids].mean())
+            
+            activation = self.immune_activation[immune_neighbours[k]]
+            
+            contexts.append({
+                'readings': readings[k],
+                'n_cells': len(nearby_ids),
+                'cell_type_counts': cell_type_counts,
+                'avg_resistance': avg_resistance,
+                'n_immune': len(activation),
+                'immune_activity': float(activation.mean()) if len(activation) else 0.0,
+                'bbb_permeability': vessels[vessel_ids[k]].bbb_permeability if vessels else 0.1,
+            })
+        return contexts
+    
+    def _prefetch_llm_decisions(self, guidance: Optional[Tuple[np.ndarray, np.ndarray]]):
+        """
+        Fetch this step's LLM decisions for all searching LLM nanobots at once.
+        
+        Situations already in the decision cache are answered locally. The
+        rest are sent together in one chat completion that returns a JSON
+        list of decisions; if that fails, they are asked individually, all
+        concurrently via asyncio.gather. Nanobot steps themselves stay
+        sequential on the main thread because they mutate shared substrate
+        grids and tumor cells, and their small per-bot NumPy calls hold the
+        GIL for most of their runtime.
+        """
+        llm_bots = [n for n in self.nanobots if n.needs_llm_decision(guidance)]
+        if len(llm_bots) < 2:
+            return
+        
+        # Build every nanobot's context in one pass; this also builds this
+        # step's cell snapshot, so worker threads only read it
+        contexts = self.llm_contexts(llm_bots)
+        
+        # One entry per distinct situation; nanobots sharing a key share the answer
+        pending: Dict[Tuple, Tuple[str, List[NanobotAgent]]] = {}
+        for nanobot, context in zip(llm_bots, contexts):
+            decision_key, fields = nanobot._describe_situation_for_llm(context)
+            cached_action = self.cached_llm_decision(decision_key)
+            if cached_action is not None:
+                nanobot.pending_action = cached_action
+            elif decision_key in pending:
+                pending[decision_key][1].append(nanobot)
+            else:
+                pending[decision_key] = (LLM_SITUATION_TEMPLATE.format_map(fields), [nanobot])
+        
+        if len(pending) >= 2:
+            actions = self._ask_llm_for_batch_decisions(pending)
+            for decision_key, action in actions.items():
+                self.cache_llm_decision(decision_key, action)
+                for nanobot in pending.pop(decision_key)[1]:
+                    nanobot.pending_action = action
+        
+        if not pending:
+            return
+        
+        actions = self._run_llm_coroutine(self._gather_llm_decisions(pending))
+        
+        for (_, bots), action in zip(pending.values(), actions):
+            if action is not None:
+                for nanobot in bots:
+                    nanobot.pending_action = action
+    
+    async def _gather_llm_decisions(
+        self,
+        pending: Dict[Tuple, Tuple[str, List[NanobotAgent]]]
+    ) -> List[Optional[str]]:
+        """
+        Ask for each pending decision individually, all requests in flight
+        at once (at most LLM_MAX_CONCURRENT_REQUESTS).
+        
+        Returns:
+            One action per pending entry, in order (None if the request raised)
+        """
+        semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENT_REQUESTS)
+        
+        async def decide(decision_key: Tuple, situation: str, nanobot: NanobotAgent) -> Optional[str]:
+            async with semaphore:
+                try:
+                    if self.io_async_client is not None:
+                        return await nanobot._ask_llm_for_decision_async(decision_key, situation)
+                    # Only a synchronous client is configured; block a worker thread instead
+                    return await asyncio.to_thread(
+                        nanobot._ask_llm_for_described_decision, decision_key, situation
+                    )
+                except Exception:
+                    return None  # The nanobot retries (and reports) during its own step
+        
+        return await asyncio.gather(*(
+            decide(decision_key, situation, bots[0])
+            for decision_key, (situation, bots) in pending.items()
+        ))
+    
+    def _run_llm_coroutine(self, coroutine):
+        """
+        Run a coroutine on the model's LLM event loop and wait for its result.
+        
+        The loop lives in its own daemon thread, so this also works when step()
+        is called from inside a running event loop (the FastAPI endpoints).
+        """
+        if self._llm_loop is None:
+            # Created once and reused every step; stopped with the model
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="nanobot-llm", daemon=True).start()
+            weakref.finalize(self, loop.call_soon_threadsafe, loop.stop)
+            self._llm_loop = loop
+        return asyncio.run_coroutine_threadsafe(coroutine, self._llm_loop).result()
+    
+    def _ask_llm_for_batch_decisions(
+        self,
+        pending: Dict[Tuple, Tuple[str, List[NanobotAgent]]]
+    ) -> Dict[Tuple, str]:
+        """
+        Ask for several nanobot decisions in a single chat completion.
+        
+        Args:
+            pending: decision_key -> (situation prompt, nanobots in that situation)
+            
+        Returns:
+            decision_key -> action for every decision the response covered
+            (empty if the request or JSON parsing failed)
+        """
+        keys_by_id = {}
+        sections = []
+        for decision_key, (situation, bots) in pending.items():
+            nanobot_id = bots[0].nanobot_id
+            keys_by_id[nanobot_id] = decision_key
+            sections.append(f"### Nanobot {nanobot_id}\n{situation}")
+        
+        prompt = (
+            "Decide the next action for each nanobot below.\n\n"
+            + "\n\n".join(sections)
+            + '\n\nRespond with JSON only: {"decisions": [{"id": <nanobot id>, "action": "<target|follow_trail|explore|return>"}, ...]}'
+        )
+        
+        try:
+            self.metrics['total_api_calls'] += 1
+            response = self.io_client.chat.completions.create(
+                model=self.selected_model,
+                messages=[
+                    {"role": "system", "content": "You coordinate a swarm of drug-delivery nanobots. Respond with a JSON object listing one action per nanobot."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.3,
+                max_completion_tokens=50 + 20 * len(sections),
+                timeout=20
+            )
+            decisions = json.loads(response.choices[0].message.content)["decisions"]
+        except Exception as e:
+            self.log_error(f"Batched LLM decision request failed: {str(e)}")
+            return {}
+        
+        actions = {}
+        for decision in decisions:
+            try:
+                decision_key = keys_by_id.get(int(decision["id"]))
+                action = str(decision["action"]).strip().lower()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if decision_key is not None:
+                actions[decision_key] = action if action in LLM_ACTIONS else 'explore'
+        return actions
+    
+    def cached_llm_decision(self, decision_key: Tuple) -> Optional[str]:
+        """Look up a memoized LLM decision younger than LLM_DECISION_CACHE_TTL steps (thread-safe)."""
+        with self._llm_cache_lock:
+            entry = self.llm_decision_cache.get(decision_key)
+            if entry is None:
+                return None
+            action, cached_step = entry
+            if self.step_count - cached_step > LLM_DECISION_CACHE_TTL:
+                del self.llm_decision_cache[decision_key]
+                return None
+            self.llm_decision_cache.move_to_end(decision_key)
+            return action
+    
+    def cache_llm_decision(self, decision_key: Tuple, action: str):
+        """Memoize an LLM decision, evicting the least recently used entry when full."""
+        with self._llm_cache_lock:
+            self.llm_decision_cache[decision_key] = (action, self.step_count)
+            self.llm_decision_cache.move_to_end(decision_key)
+            if len(self.llm_decision_cache) > LLM_DECISION_CACHE_SIZE:
+                self.llm_decision_cache.popitem(last=False)
+    
     def _update_tumor_cells(self):
         """Update all tumor cells based on local microenvironment."""
-        toxicity_substrate = self.microenv.get_substrate('toxicity_signal')
         new_cells = []  # Track cells ready to divide
         next_cell_id = len(self.geometry.tumor_cells)
         
-        for cell in self.geometry.tumor_cells:
-            if not cell.is_alive:
-                continue
-            
-            # Get local oxygen and drug concentrations
-            oxygen = self.microenv.get_concentration_at('oxygen', cell.position)
-            drug = self.microenv.get_concentration_at('drug', cell.position)
-            
-            # Update cell state
-            cell.update_oxygen_status(oxygen, self.microenv.dt)
-            cell.absorb_drug(drug, self.microenv.dt)
-            
+        living_cells = self.geometry.get_living_cells()
+        if not living_cells:
+            return
+        dt = self.microenv.dt
+        
+        # Get local oxygen and drug concentrations and sink/source voxels for
+        # every living cell at once, from voxel indices cached until cells move
+        arrays = self.geometry.cell_arrays
+        living_rows = np.flatnonzero(arrays.alive)
+        sample_voxels, source_voxels = self.geometry.cell_voxels(self.microenv)
+        oxygen_levels, drug_levels = self.microenv.sample_voxels(('oxygen', 'drug'), sample_voxels[living_rows])
+        voxels = source_voxels[living_rows]
+        
+        # Hypoxia, recovery and necrosis, then drug uptake, for every living cell at once
+        self.geometry.update_oxygen_and_drug(living_rows, oxygen_levels, drug_levels, dt)
+        
+        for cell, oxygen in zip(living_cells, oxygen_levels.tolist()):
             # Update cell growth and check for division
-            if cell.update_growth(self.microenv.dt, oxygen):
+            if cell.update_growth(dt, oxygen):
                 daughter_cell = cell.divide(next_cell_id)
                 if daughter_cell:
                     new_cells.append(daughter_cell)
                     next_cell_id += 1
+        
+        # Phases after this update (cell setters keep the array store current)
+        phase_codes = arrays.phases[living_rows]
+        
+        # Oxygen consumption by phase (TumorCell.get_oxygen_consumption):
+        # full rate when viable, 30% when hypoxic, none once dead
+        still_alive = arrays.alive[living_rows]
+        consumption = arrays.column('oxygen_uptake_rate')[living_rows] * np.select(
+            [
+                still_alive & (phase_codes == PHASE_CODES[CellPhase.VIABLE]),
+                still_alive & (phase_codes == PHASE_CODES[CellPhase.HYPOXIC])
+            ],
+            [1.0, 0.3],
+            default=0.0
+        )
+        
+        # Add oxygen consumption as sink
+        oxygen_substrate = self.microenv.get_substrate('oxygen')
+        if oxygen_substrate:
+            oxygen_substrate.add_sources(voxels, -consumption * dt)
+        
+        # Generate toxicity signal from hypoxic/necrotic cells and drug overdose
+        toxicity_substrate = self.microenv.get_substrate('toxicity_signal')
+        if toxicity_substrate:
+            toxicity = (
+                2.0 * (phase_codes == PHASE_CODES[CellPhase.HYPOXIC])     # Hypoxic cells emit moderate toxicity
+                + 5.0 * (phase_codes == PHASE_CODES[CellPhase.NECROTIC])  # Necrotic cells emit high toxicity
+                + 3.0 * (drug_levels > 50.0)  # Drug overdose areas (high drug concentration)
+            )
             
-            # Add oxygen consumption as sink
-            voxel = self.microenv.position_to_voxel(cell.position)
-            oxygen_substrate = self.microenv.get_substrate('oxygen')
-            if oxygen_substrate:
-                oxygen_substrate.add_sink(voxel, cell.get_oxygen_consumption() * self.microenv.dt)
-            
-            # Generate toxicity signal from hypoxic/necrotic cells and drug overdose
-            if toxicity_substrate:
-                toxicity_amount = 0.0
-                
-                # Hypoxic cells emit moderate toxicity
-                if cell.phase == CellPhase.HYPOXIC:
-                    toxicity_amount += 2.0
-                
-                # Necrotic cells emit high toxicity
-                if cell.phase == CellPhase.NECROTIC:
-                    toxicity_amount += 5.0
-                
-                # Drug overdose areas emit toxicity (high drug concentration)
-                if drug > 50.0:  # Threshold for drug overdose
-                    toxicity_amount += 3.0
-                
-                # Add toxicity signal if any toxicity is generated
-                if toxicity_amount > 0.0:
-                    toxicity_substrate.add_source(voxel, toxicity_amount)
+            # Add toxicity signal only where any toxicity is generated
+            emitting = toxicity > 0.0
+            toxicity_substrate.add_sources(voxels[emitting], toxicity[emitting])
         
         # Add newly divided cells to the tumor geometry
-        self.geometry.tumor_cells.extend(new_cells)
+        self.geometry.add_cells(new_cells)
         
         # Apply cell mechanics (repulsion) to prevent overlap
         if new_cells:
@@ -1186,80 +1942,96 @@ class TumorNanobotModel:
         Apply simple repulsion forces between nearby cells to prevent overlap.
         This is a simplified version of cell mechanics - not full PhysiCell.
         """
-        cells = self.geometry.tumor_cells
+        living_cells = self.geometry.get_living_cells()
+        if len(living_cells) < 2:
+            return
         repulsion_radius = 25.0  # µm - cells repel if closer than this
         repulsion_force = 2.0    # µm displacement per step
         
-        for i, cell1 in enumerate(cells):
-            if not cell1.is_alive:
-                continue
-                
-            for j in range(i + 1, len(cells)):
-                cell2 = cells[j]
-                if not cell2.is_alive:
-                    continue
-                
-                # Calculate distance between cells
-                dx = cell2.position[0] - cell1.position[0]
-                dy = cell2.position[1] - cell1.position[1]
-                distance = np.sqrt(dx**2 + dy**2)
-                
-                # If cells are overlapping, push them apart
-                if distance < repulsion_radius and distance > 0.1:
-                    # Normalize direction
-                    nx = dx / distance
-                    ny = dy / distance
-                    
-                    # Calculate repulsion (inversely proportional to distance)
-                    repulsion_magnitude = repulsion_force * (repulsion_radius - distance) / repulsion_radius
-                    
-                    # Apply repulsion to both cells (equal and opposite)
-                    cell1.position = (
-                        cell1.position[0] - nx * repulsion_magnitude * 0.5,
-                        cell1.position[1] - ny * repulsion_magnitude * 0.5,
-                        cell1.position[2]
-                    )
-                    cell2.position = (
-                        cell2.position[0] + nx * repulsion_magnitude * 0.5,
-                        cell2.position[1] + ny * repulsion_magnitude * 0.5,
-                        cell2.position[2]
-                    )
+        # float32, like the model's other µm-scale geometry arrays
+        arrays = self.geometry.cell_arrays
+        positions = arrays.positions[np.flatnonzero(arrays.alive), :2].astype(np.float32)
+        
+        # Only pairs within the repulsion radius interact; the KD-tree finds
+        # them without testing every pair
+        pairs = cKDTree(positions).query_pairs(repulsion_radius, output_type='ndarray')
+        if len(pairs) == 0:
+            return
+        first, second = pairs[:, 0], pairs[:, 1]
+        offsets = positions[second] - positions[first]
+        squared = np.einsum('ij,ij->i', offsets, offsets)
+        
+        # If cells are overlapping, push them apart (compared squared, so the
+        # sqrt is only taken for pairs that actually interact)
+        overlapping = (squared < repulsion_radius * repulsion_radius) & (squared > 0.01)
+        first, second = first[overlapping], second[overlapping]
+        offsets = offsets[overlapping]
+        distances = np.sqrt(squared[overlapping])
+        
+        # Repulsion (inversely proportional to distance) along the normalized
+        # offset, half to each cell
+        push_scale = 0.5 * repulsion_force / repulsion_radius
+        pushes = offsets * (push_scale * (repulsion_radius - distances) / distances)[:, np.newaxis]
+        
+        # Apply repulsion to both cells (equal and opposite, half each),
+        # summed per cell with bincount (much faster than np.add.at)
+        n_cells = len(positions)
+        new_positions = positions.copy()
+        for axis in range(2):
+            new_positions[:, axis] += (
+                np.bincount(second, weights=pushes[:, axis], minlength=n_cells)
+                - np.bincount(first, weights=pushes[:, axis], minlength=n_cells)
+            )
+        
+        for i in np.union1d(first, second).tolist():
+            cell = living_cells[i]
+            cell.position = (
+                float(new_positions[i, 0]),
+                float(new_positions[i, 1]),
+                cell.position[2]
+            )
     
     def _update_immune_cells(self):
         """Update immune cells and their interactions with tumor cells."""
-        for immune_cell in self.geometry.immune_cells:
-            if immune_cell.is_active:
-                # Update immune cell state and interactions
-                immune_cell.update(self.microenv.dt, self.geometry.tumor_cells)
-                
-                # Secrete cytokines into microenvironment
-                immune_cell.secrete_cytokines(self.microenv)
+        active_cells = [cell for cell in self.geometry.immune_cells if cell.is_active]
+        
+        # Update immune cell state and interactions for all cells at once
+        self.geometry.update_immune_cells(self.microenv.dt)
+        
+        # Secrete cytokines into microenvironment
+        ImmuneCell.secrete_cytokines_batch(active_cells, self.microenv)
     
     def _apply_vessel_sources(self):
         """Apply oxygen and drug sources from blood vessels."""
         oxygen_substrate = self.microenv.get_substrate('oxygen')
         drug_substrate = self.microenv.get_substrate('drug')
+        vessels = self.geometry.vessels
+        if not vessels:
+            return
         
-        for vessel in self.geometry.vessels:
-            voxel = self.microenv.position_to_voxel(vessel.position)
-            
-            # Vessels supply oxygen
-            if oxygen_substrate:
-                oxygen_substrate.add_source(voxel, vessel.oxygen_supply * 0.5)
-            
-            # Vessels supply drugs with BBB permeability consideration
-            if drug_substrate and vessel.drug_supply > 0:
-                # Apply BBB permeability factor
-                effective_drug_supply = vessel.drug_supply * vessel.bbb_permeability
-                drug_substrate.add_source(voxel, effective_drug_supply)
+        voxels = self.microenv.positions_to_voxels([vessel.position for vessel in vessels])
+        
+        # Vessels supply oxygen
+        if oxygen_substrate:
+            oxygen_supply = np.fromiter((vessel.oxygen_supply for vessel in vessels), dtype=float, count=len(vessels))
+            oxygen_substrate.add_sources(voxels, oxygen_supply * 0.5)
+        
+        # Vessels supply drugs with BBB permeability consideration
+        if drug_substrate:
+            effective_drug_supply = np.fromiter(
+                (vessel.drug_supply * vessel.bbb_permeability if vessel.drug_supply > 0 else 0.0
+                 for vessel in vessels),
+                dtype=float, count=len(vessels)
+            )
+            drug_substrate.add_sources(voxels, effective_drug_supply)
     
     def _update_metrics(self):
         """Update simulation metrics."""
         # Count cells by phase
-        self.metrics['hypoxic_cells'] = len(self.geometry.get_cells_in_phase(CellPhase.HYPOXIC))
-        self.metrics['viable_cells'] = len(self.geometry.get_cells_in_phase(CellPhase.VIABLE))
-        self.metrics['necrotic_cells'] = len(self.geometry.get_cells_in_phase(CellPhase.NECROTIC))
-        self.metrics['apoptotic_cells'] = len(self.geometry.get_cells_in_phase(CellPhase.APOPTOTIC))
+        self.metrics['hypoxic_cells'] = self.geometry.count_cells_in_phase(CellPhase.HYPOXIC)
+        self.metrics['viable_cells'] = self.geometry.count_cells_in_phase(CellPhase.VIABLE)
+        self.metrics['necrotic_cells'] = self.geometry.count_cells_in_phase(CellPhase.NECROTIC)
+        self.metrics['apoptotic_cells'] = self.geometry.count_cells_in_phase(CellPhase.APOPTOTIC)
         
         # Count killed cells (apoptotic only, not natural necrosis)
         self.metrics['cells_killed'] = self.metrics['apoptotic_cells']
@@ -1276,6 +2048,29 @@ class TumorNanobotModel:
         self.metrics['food_collected_by_llm'] = self.metrics['deliveries_by_llm']
         self.metrics['food_collected_by_rule'] = self.metrics['deliveries_by_rule']
     
+    def snapshot_nanobots(self) -> Dict[str, np.ndarray]:
+        """
+        Column-wise snapshot of the swarm for per-step serialization.
+        
+        Carries the same fields as NanobotAgent.to_dict(), one array per
+        field in nanobot id order, so callers build their records from a
+        handful of arrays instead of one dict per nanobot.
+        """
+        bots = self.nanobots
+        n_bots = len(bots)
+        return {
+            'id': np.fromiter((n.nanobot_id for n in bots), dtype=int, count=n_bots),
+            'position': np.array([n.position[:2] for n in bots], dtype=float).reshape(n_bots, 2),
+            'state': np.array([n.state.value for n in bots], dtype=str),
+            'drug_payload': np.fromiter((n.drug_payload for n in bots), dtype=float, count=n_bots),
+            'deliveries_made': np.fromiter((n.deliveries_made for n in bots), dtype=int, count=n_bots),
+            'total_drug_delivered': np.fromiter(
+                (n.total_drug_delivered for n in bots), dtype=float, count=n_bots
+            ),
+            'is_llm': np.fromiter((n.is_llm_controlled for n in bots), dtype=bool, count=n_bots),
+            'has_target': np.fromiter((n.target_cell is not None for n in bots), dtype=bool, count=n_bots),
+        }
+    
     def log_error(self, message: str):
         """Log an error message."""
         self.errors.append(message)
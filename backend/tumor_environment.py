@@ -9,8 +9,11 @@ References:
 - Ghaffarizadeh et al. (2018) "PhysiCell: An open source physics-based cell simulator"
 """
 
+import math
+import operator
 import numpy as np
-from typing import List, Tuple, Optional, Dict
+from scipy.spatial import cKDTree
+from typing import List, Tuple, Optional, Dict, Set
 from enum import Enum
 
 
@@ -38,6 +41,84 @@ class ImmuneCellType(Enum):
     DENDRITIC = "dendritic"         # Dendritic cells
 
 
+# Integer codes for CellPhase and CellType, as stored in TumorCellArrays
+PHASE_CODES = {phase: code for code, phase in enumerate(CellPhase)}
+CELL_TYPES = tuple(CellType)
+TYPE_CODES = {cell_type: code for code, cell_type in enumerate(CELL_TYPES)}
+
+
+# Per-type tumor cell parameters, indexed by TYPE_CODES
+# (STEM_CELL, DIFFERENTIATED, RESISTANT, INVASIVE)
+TYPE_PARAMETERS = {
+    # mmHg/min; stem cells have the lowest metabolism, invasive cells the highest
+    'oxygen_uptake_rate': np.array([8.0, 10.0, 12.0, 15.0]),
+    # mmHg; raised for all types to generate more hypoxic cells
+    'hypoxic_threshold': np.array([8.0, 10.0, 9.0, 12.0]),
+    # Minutes of hypoxia before necrosis; stem cells are very resistant
+    'necrotic_time_threshold': np.array([60.0, 30.0, 45.0, 20.0]),
+    # Stem and resistant cells are drug-resistant, invasive slightly more sensitive
+    'drug_sensitivity': np.array([0.3, 1.0, 0.5, 1.2]),
+    # Medically realistic lethal doses in μg
+    'lethal_drug_dose': np.array([2.0, 0.5, 1.0, 0.3]),
+    # Resistance level (0-1)
+    'resistance_level': np.array([0.8, 0.1, 0.6, 0.2]),
+    'mutation_rate': np.array([0.01, 0.05, 0.1, 0.15]),
+    # Minutes needed to divide: 2 h for stem cells down to 1 h for invasive
+    'division_threshold': np.array([120.0, 90.0, 100.0, 60.0]),
+}
+
+# The same parameters as plain floats per type, for creating single cells
+_TYPE_PARAMETER_VALUES = {
+    cell_type: {name: float(values[code]) for name, values in TYPE_PARAMETERS.items()}
+    for cell_type, code in TYPE_CODES.items()
+}
+
+
+# Cytokine secreted by each immune cell type, and its rate per unit activation
+CYTOKINE_SECRETION = {
+    ImmuneCellType.T_CELL: ('ifn_gamma', 2.0),      # IFN-gamma - enhances immune response
+    ImmuneCellType.MACROPHAGE: ('tnf_alpha', 1.5),  # TNF-alpha - pro-inflammatory
+    ImmuneCellType.NK_CELL: ('perforin', 3.0),      # Perforin/Granzyme - cytotoxic
+}
+
+
+# Per-cell metabolic, drug and growth values that live in the geometry's
+# TumorCellArrays once a cell is added, so the model can update them in bulk
+CELL_COLUMNS = (
+    'oxygen_uptake_rate', 'hypoxic_threshold', 'hypoxic_duration', 'necrotic_time_threshold',
+    'drug_sensitivity', 'accumulated_drug', 'lethal_drug_dose', 'resistance_level',
+    'mutation_rate', 'growth_progress', 'division_threshold'
+)
+
+
+class _CellColumn:
+    """
+    TumorCell attribute backed by a column of its geometry's TumorCellArrays.
+    
+    Before the cell is added to a geometry the value is kept in the
+    underscore-prefixed slot of the same name.
+    """
+    
+    def __set_name__(self, owner, name: str):
+        self.name = name
+        self.slot = '_' + name
+    
+    def __get__(self, cell: Optional['TumorCell'], owner=None):
+        if cell is None:
+            return self
+        geometry = cell._geometry
+        if geometry is None:
+            return getattr(cell, self.slot)
+        return float(geometry.cell_arrays._columns[self.name][cell._index])
+    
+    def __set__(self, cell: 'TumorCell', value: float):
+        geometry = cell._geometry
+        if geometry is None:
+            setattr(cell, self.slot, value)
+        else:
+            geometry.cell_arrays._columns[self.name][cell._index] = value
+
+
 class TumorCell:
     """
     Represents a single tumor cell in the microenvironment.
@@ -47,6 +128,23 @@ class TumorCell:
     consume oxygen and can be killed by drugs.
     """
     
+    __slots__ = (
+        'cell_id', '_position', 'radius', '_phase', '_geometry', '_index', 'cell_type',
+        'necrotic_threshold', '_is_alive', 'time_of_death', 'generation'
+    ) + tuple('_' + name for name in CELL_COLUMNS)
+    
+    oxygen_uptake_rate = _CellColumn()
+    hypoxic_threshold = _CellColumn()
+    hypoxic_duration = _CellColumn()
+    necrotic_time_threshold = _CellColumn()
+    drug_sensitivity = _CellColumn()
+    accumulated_drug = _CellColumn()
+    lethal_drug_dose = _CellColumn()
+    resistance_level = _CellColumn()  # 0 (none) to 1 (fully resistant)
+    mutation_rate = _CellColumn()
+    growth_progress = _CellColumn()
+    division_threshold = _CellColumn()
+    
     def __init__(
         self,
         cell_id: int,
@@ -55,117 +153,83 @@ class TumorCell:
         initial_phase: CellPhase = CellPhase.VIABLE,
         cell_type: CellType = CellType.DIFFERENTIATED
     ):
+        self._geometry: Optional['TumorGeometry'] = None  # Set when added to a geometry
+        self._index = -1  # Row in the geometry's cell_arrays once added
         self.cell_id = cell_id
         self.position = position  # (x, y, z) in microns
         self.radius = radius
-        self.phase = initial_phase
+        self._phase = initial_phase
         self.cell_type = cell_type
         
+        parameters = _TYPE_PARAMETER_VALUES[cell_type]
+        
         # Metabolic parameters (vary by cell type)
-        self.oxygen_uptake_rate = self._get_oxygen_uptake_rate()
-        self.hypoxic_threshold = self._get_hypoxic_threshold()
+        self.oxygen_uptake_rate = parameters['oxygen_uptake_rate']
+        self.hypoxic_threshold = parameters['hypoxic_threshold']
         self.necrotic_threshold = 2.5   # mmHg, below this for too long → necrotic
         self.hypoxic_duration = 0.0     # minutes spent hypoxic
-        self.necrotic_time_threshold = self._get_necrotic_time_threshold()
+        self.necrotic_time_threshold = parameters['necrotic_time_threshold']
         
         # Drug interaction (vary by cell type)
-        self.drug_sensitivity = self._get_drug_sensitivity()
+        self.drug_sensitivity = parameters['drug_sensitivity']
         self.accumulated_drug = 0.0     # Total drug absorbed
-        self.lethal_drug_dose = self._get_lethal_drug_dose()
+        self.lethal_drug_dose = parameters['lethal_drug_dose']
         
         # Resistance mechanisms
-        self.resistance_level = self._get_resistance_level()
-        self.mutation_rate = self._get_mutation_rate()
+        self.resistance_level = parameters['resistance_level']
+        self.mutation_rate = parameters['mutation_rate']
         
         # State tracking
-        self.is_alive = True
+        self._is_alive = True
         self.time_of_death = None
         self.generation = 0  # Track cell divisions
         
         # Cell proliferation tracking
         self.growth_progress = 0.0  # minutes of growth
-        self.division_threshold = self._get_division_threshold()  # minutes needed to divide
-    
-    def _get_oxygen_uptake_rate(self) -> float:
-        """Get oxygen uptake rate based on cell type."""
-        rates = {
-            CellType.STEM_CELL: 8.0,      # Lower metabolism
-            CellType.DIFFERENTIATED: 10.0, # Normal rate
-            CellType.RESISTANT: 12.0,     # Higher metabolism
-            CellType.INVASIVE: 15.0       # Very high metabolism
-        }
-        return rates.get(self.cell_type, 10.0)
-    
-    def _get_hypoxic_threshold(self) -> float:
-        """Get hypoxic threshold based on cell type."""
-        thresholds = {
-            CellType.STEM_CELL: 8.0,       # Increased to generate more hypoxic cells
-            CellType.DIFFERENTIATED: 10.0,  # Increased to generate more hypoxic cells
-            CellType.RESISTANT: 9.0,       # Increased to generate more hypoxic cells
-            CellType.INVASIVE: 12.0        # Increased to generate more hypoxic cells
-        }
-        return thresholds.get(self.cell_type, 10.0)  # Default increased for more hypoxic cells
-    
-    def _get_necrotic_time_threshold(self) -> float:
-        """Get time before necrosis based on cell type."""
-        thresholds = {
-            CellType.STEM_CELL: 60.0,      # Very resistant
-            CellType.DIFFERENTIATED: 30.0, # Normal
-            CellType.RESISTANT: 45.0,      # Somewhat resistant
-            CellType.INVASIVE: 20.0       # Less resistant
-        }
-        return thresholds.get(self.cell_type, 30.0)
-    
-    def _get_drug_sensitivity(self) -> float:
-        """Get drug sensitivity based on cell type."""
-        sensitivities = {
-            CellType.STEM_CELL: 0.3,       # Highly resistant
-            CellType.DIFFERENTIATED: 1.0,  # Normal sensitivity
-            CellType.RESISTANT: 0.5,       # Resistant
-            CellType.INVASIVE: 1.2        # Slightly more sensitive
-        }
-        return sensitivities.get(self.cell_type, 1.0)
-    
-    def _get_lethal_drug_dose(self) -> float:
-        """Get lethal drug dose based on cell type (medically realistic values in μg)."""
-        doses = {
-            CellType.STEM_CELL: 2.0,      # 2 μg (highly resistant)
-            CellType.DIFFERENTIATED: 0.5,  # 0.5 μg (normal sensitivity)
-            CellType.RESISTANT: 1.0,      # 1 μg (resistant)
-            CellType.INVASIVE: 0.3       # 0.3 μg (more sensitive)
-        }
-        return doses.get(self.cell_type, 0.5)
+        self.division_threshold = parameters['division_threshold']  # minutes needed to divide
+    
+    @property
+    def position(self) -> Tuple[float, float, float]:
+        """(x, y, z) position in microns."""
+        return self._position
+    
+    @position.setter
+    def position(self, value: Tuple[float, float, float]):
+        self._position = value
+        if self._geometry is not None:
+            self._geometry.cell_arrays._positions[self._index] = value
+            self._geometry._living_tree = None
+            self._geometry._cell_voxels = None
+            self._geometry._cell_vessels = None
+    
+    @property
+    def phase(self) -> CellPhase:
+        """Current cell phase."""
+        return self._phase
+    
+    @phase.setter
+    def phase(self, value: CellPhase):
+        old_phase = self._phase
+        self._phase = value
+        # Let the owning geometry know its phase lists need rebuilding
+        if value != old_phase and self._geometry is not None:
+            self._geometry._mark_phase_dirty(old_phase, value)
+            self._geometry.cell_arrays._phases[self._index] = PHASE_CODES[value]
+    
+    @property
+    def is_alive(self) -> bool:
+        """Whether the cell is still alive."""
+        return self._is_alive
+    
+    @is_alive.setter
+    def is_alive(self, value: bool):
+        old_value = self._is_alive
+        self._is_alive = value
+        # Deaths invalidate the geometry's cached living-cell list
+        if value != old_value and self._geometry is not None:
+            self._geometry._mark_alive_changed(value)
+            self._geometry.cell_arrays._alive[self._index] = value
     
-    def _get_resistance_level(self) -> float:
-        """Get resistance level (0-1) based on cell type."""
-        levels = {
-            CellType.STEM_CELL: 0.8,       # Very resistant
-            CellType.DIFFERENTIATED: 0.1,  # Low resistance
-            CellType.RESISTANT: 0.6,       # High resistance
-            CellType.INVASIVE: 0.2        # Low resistance
-        }
-        return levels.get(self.cell_type, 0.1)
-    
-    def _get_mutation_rate(self) -> float:
-        """Get mutation rate based on cell type."""
-        rates = {
-            CellType.STEM_CELL: 0.01,      # Low mutation rate
-            CellType.DIFFERENTIATED: 0.05, # Normal
-            CellType.RESISTANT: 0.1,       # High mutation rate
-            CellType.INVASIVE: 0.15       # Very high mutation rate
-        }
-        return rates.get(self.cell_type, 0.05)
-    
-    def _get_division_threshold(self) -> float:
-        """Get time required for cell division based on cell type (in minutes)."""
-        thresholds = {
-            CellType.STEM_CELL: 120.0,       # 2 hours (slower division)
-            CellType.DIFFERENTIATED: 90.0,   # 1.5 hours (normal)
-            CellType.RESISTANT: 100.0,       # 1.67 hours (slightly slower)
-            CellType.INVASIVE: 60.0         # 1 hour (fast dividing)
-        }
-        return thresholds.get(self.cell_type, 90.0)
-        
     def update_oxygen_status(self, oxygen_concentration: float, dt: float):
         """
         Update cell state based on local oxygen concentration.
@@ -221,12 +285,14 @@ class TumorCell:
             self.phase = CellPhase.APOPTOTIC
             self.is_alive = False
             self.time_of_death = 'apoptosis'
-            print(f"[TUMOR CELL] Cell {self.cell_id} killed by nanobot proximity delivery (accumulated: {self.accumulated_drug:.2f} μg, threshold: {self.lethal_drug_dose:.2f} μg)")
+            # Recorded for the owning geometry's once-per-step kill summary
+            if self._geometry is not None:
+                self._geometry._drug_kills.append((self.cell_id, self.accumulated_drug, self.lethal_drug_dose))
             return True
         
         return False
     
-    def absorb_drug(self, drug_concentration: float, dt: float):
+    def absorb_drug(self, drug_concentration: float, dt: float, rng: Optional[np.random.Generator] = None):
         """
         Absorb drug from local environment and check for apoptosis.
         Accounts for resistance mechanisms and adaptive responses.
@@ -234,9 +300,11 @@ class TumorCell:
         Args:
             drug_concentration: Local drug concentration (arbitrary units)
             dt: Timestep in minutes
+            rng: Random generator (defaults to the owning geometry's)
         """
         if not self.is_alive:
             return
+        rng = rng if rng is not None else self._random_source()
             
         # Apply resistance mechanisms
         effective_drug_concentration = drug_concentration * (1.0 - self.resistance_level)
@@ -247,7 +315,7 @@ class TumorCell:
         self.accumulated_drug += drug_absorbed
         
         # Adaptive resistance: cells can develop more resistance over time
-        if drug_absorbed > 0 and np.random.random() < self.mutation_rate * dt:
+        if drug_absorbed > 0 and rng.random() < self.mutation_rate * dt:
             self.resistance_level = min(1.0, self.resistance_level + 0.01)
             self.drug_sensitivity = max(0.1, self.drug_sensitivity - 0.01)
         
@@ -281,24 +349,26 @@ class TumorCell:
         
         return False
     
-    def divide(self, new_cell_id: int) -> Optional['TumorCell']:
+    def divide(self, new_cell_id: int, rng: Optional[np.random.Generator] = None) -> Optional['TumorCell']:
         """
         Divide this cell into a daughter cell.
         
         Args:
             new_cell_id: ID for the new daughter cell
+            rng: Random generator (defaults to the owning geometry's)
             
         Returns:
             New TumorCell instance or None if division fails
         """
         if not self.is_alive or self.phase != CellPhase.VIABLE:
             return None
+        rng = rng if rng is not None else self._random_source()
         
         # Reset growth progress
         self.growth_progress = 0.0
         
         # Place daughter cell nearby (random angle, distance = 2 * radius)
-        angle = np.random.uniform(0, 2 * np.pi)
+        angle = rng.uniform(0, 2 * np.pi)
         offset_distance = 2.0 * self.radius
         
         new_position = (
@@ -309,9 +379,9 @@ class TumorCell:
         
         # Daughter cell inherits parent's type (with small chance of mutation)
         daughter_type = self.cell_type
-        if np.random.random() < self.mutation_rate:
+        if rng.random() < self.mutation_rate:
             # Mutate to a random cell type
-            daughter_type = np.random.choice(list(CellType))
+            daughter_type = CELL_TYPES[rng.choice(len(CELL_TYPES))]
         
         # Create daughter cell
         daughter_cell = TumorCell(
@@ -325,6 +395,10 @@ class TumorCell:
         
         return daughter_cell
     
+    def _random_source(self):
+        """The owning geometry's generator, or the global NumPy RNG for a detached cell."""
+        return self._geometry._rng if self._geometry is not None else np.random
+    
     def get_oxygen_consumption(self) -> float:
         """
         Calculate oxygen consumption rate based on cell phase.
@@ -361,6 +435,100 @@ class TumorCell:
         }
 
 
+class TumorCellArrays:
+    """
+    Structure-of-arrays store of the tumor cells' hot fields.
+    
+    Row i belongs to geometry.tumor_cells[i]. TumorCell's property setters
+    write positions, phases and liveness through to their row, so
+    vectorized code can read them as arrays without visiting the cell
+    objects; those properties are views of the used rows and must be
+    treated as read-only. The CELL_COLUMNS values (resistance among them)
+    are stored only here once a cell is added, so column() views may also
+    be updated in place.
+    Storage doubles as cells are added.
+    """
+    
+    def __init__(self, capacity: int = 256):
+        self.size = 0
+        self._positions = np.zeros((capacity, 3))
+        self._phases = np.zeros(capacity, dtype=np.int8)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._types = np.zeros(capacity, dtype=np.int8)
+        # float32, like the microenvironment fields: these rates, doses and
+        # durations need a few significant digits, not float64's
+        self._columns = {name: np.zeros(capacity, dtype=np.float32) for name in CELL_COLUMNS}
+    
+    @property
+    def positions(self) -> np.ndarray:
+        """(N, 3) cell positions in microns."""
+        return self._positions[:self.size]
+    
+    @property
+    def phases(self) -> np.ndarray:
+        """(N,) PHASE_CODES of the cells' phases."""
+        return self._phases[:self.size]
+    
+    @property
+    def alive(self) -> np.ndarray:
+        """(N,) mask of living cells."""
+        return self._alive[:self.size]
+    
+    @property
+    def types(self) -> np.ndarray:
+        """(N,) TYPE_CODES of the cells' types."""
+        return self._types[:self.size]
+    
+    @property
+    def resistance(self) -> np.ndarray:
+        """(N,) cell resistance levels (the resistance_level column)."""
+        return self._columns['resistance_level'][:self.size]
+    
+    def column(self, name: str) -> np.ndarray:
+        """(N,) values of one of the CELL_COLUMNS."""
+        return self._columns[name][:self.size]
+    
+    def append(self, cells: List[TumorCell]):
+        """Copy cells into the next free rows and record each cell's row."""
+        if not cells:
+            return
+        start, end = self.size, self.size + len(cells)
+        if end > len(self._alive):
+            self.reserve(max(end, 2 * len(self._alive)))
+        
+        self._positions[start:end] = _as_xyz([cell.position for cell in cells])
+        self._phases[start:end] = [PHASE_CODES[cell.phase] for cell in cells]
+        self._alive[start:end] = [cell.is_alive for cell in cells]
+        self._types[start:end] = [TYPE_CODES[cell.cell_type] for cell in cells]
+        for name, column in self._columns.items():
+            column[start:end] = [getattr(cell, name) for cell in cells]
+        for index, cell in enumerate(cells, start):
+            cell._index = index
+        self.size = end
+    
+    def reserve(self, capacity: int):
+        """Make room for capacity rows in total, so appends up to it do not reallocate."""
+        if capacity > len(self._alive):
+            self._grow(capacity)
+    
+    def clear(self):
+        """Forget every row (storage is kept for reuse)."""
+        self.size = 0
+    
+    def _grow(self, capacity: int):
+        """Reallocate every array with room for capacity rows."""
+        def grown(old: np.ndarray) -> np.ndarray:
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            # Copy every old row, not just the used ones: cells being
+            # re-appended after clear() still read their values from them
+            new[:len(old)] = old
+            return new
+        
+        for name in ('_positions', '_phases', '_alive', '_types'):
+            setattr(self, name, grown(getattr(self, name)))
+        self._columns = {name: grown(column) for name, column in self._columns.items()}
+
+
 class ImmuneCell:
     """
     Represents an immune cell in the tumor microenvironment.
@@ -369,14 +537,21 @@ class ImmuneCell:
     and be influenced by the tumor microenvironment.
     """
     
+    __slots__ = (
+        'cell_id', 'position', 'cell_type', 'activation_level', 'radius',
+        'cytotoxicity', 'migration_speed', 'lifespan', 'age', 'target_cell', 'is_active', '_rng'
+    )
+    
     def __init__(
         self,
         cell_id: int,
         position: Tuple[float, float, float],
         cell_type: ImmuneCellType,
         activation_level: float = 0.5,  # 0-1, how activated the cell is
-        radius: float = 8.0  # µm, typical for immune cells
+        radius: float = 8.0,  # µm, typical for immune cells
+        rng: Optional[np.random.Generator] = None  # Shared with the geometry; global RNG if None
     ):
+        self._rng = rng if rng is not None else np.random
         self.cell_id = cell_id
         self.position = position
         self.cell_type = cell_type
@@ -447,11 +622,10 @@ class ImmuneCell:
         
         # Attack target cell if close enough
         if self.target_cell:
-            distance = np.linalg.norm(
-                np.array(self.position[:2]) - np.array(self.target_cell.position[:2])
-            )
+            dx = self.position[0] - self.target_cell.position[0]
+            dy = self.position[1] - self.target_cell.position[1]
             
-            if distance < 20.0:  # Within attack range
+            if dx * dx + dy * dy < 400.0:  # Within attack range (20 µm)
                 self._attack_tumor_cell(self.target_cell, dt)
     
     def _find_nearest_tumor_cell(self, tumor_cells: List[TumorCell]) -> Optional[TumorCell]:
@@ -460,12 +634,10 @@ class ImmuneCell:
         if not living_cells:
             return None
         
-        distances = [
-            np.linalg.norm(np.array(cell.position[:2]) - np.array(self.position[:2]))
-            for cell in living_cells
-        ]
-        
-        nearest_idx = np.argmin(distances)
+        # One vectorized pass; squared distances preserve the ordering
+        offsets = np.array([cell.position[:2] for cell in living_cells], dtype=float)
+        offsets -= np.asarray(self.position[:2], dtype=float)
+        nearest_idx = int(np.argmin(np.einsum('ij,ij->i', offsets, offsets)))
         return living_cells[nearest_idx]
     
     def _attack_tumor_cell(self, target: TumorCell, dt: float):
@@ -486,7 +658,7 @@ class ImmuneCell:
         target.drug_sensitivity = min(2.0, target.drug_sensitivity + damage * 0.05)
         
         # If damage is high enough, kill the cell directly
-        if damage > 0.5 and np.random.random() < damage:
+        if damage > 0.5 and self._rng.random() < damage:
             target.phase = CellPhase.APOPTOTIC
             target.is_alive = False
             target.time_of_death = 'immune_attack'
@@ -498,23 +670,31 @@ class ImmuneCell:
         Args:
             microenv: The microenvironment to add cytokines to
         """
-        voxel = microenv.position_to_voxel(self.position)
-        
-        # Different cell types secrete different cytokines
-        if self.cell_type == ImmuneCellType.T_CELL:
-            # IFN-gamma - enhances immune response
-            if 'ifn_gamma' in microenv.substrates:
-                microenv.substrates['ifn_gamma'].add_source(voxel, 2.0 * self.activation_level)
+        ImmuneCell.secrete_cytokines_batch([self], microenv)
+    
+    @staticmethod
+    def secrete_cytokines_batch(immune_cells: List['ImmuneCell'], microenv: 'Microenvironment'):
+        """
+        Secrete cytokines for many immune cells with one batched source
+        update per cytokine.
         
-        elif self.cell_type == ImmuneCellType.MACROPHAGE:
-            # TNF-alpha - pro-inflammatory
-            if 'tnf_alpha' in microenv.substrates:
-                microenv.substrates['tnf_alpha'].add_source(voxel, 1.5 * self.activation_level)
+        Args:
+            immune_cells: Immune cells that secrete this step
+            microenv: The microenvironment to add cytokines to
+        """
+        if not immune_cells:
+            return
+        voxels = microenv.positions_to_voxels(_as_xyz([cell.position for cell in immune_cells]))
         
-        elif self.cell_type == ImmuneCellType.NK_CELL:
-            # Perforin/Granzyme - cytotoxic
-            if 'perforin' in microenv.substrates:
-                microenv.substrates['perforin'].add_source(voxel, 3.0 * self.activation_level)
+        # Different cell types secrete different cytokines
+        for cell_type, (cytokine, rate) in CYTOKINE_SECRETION.items():
+            substrate = microenv.substrates.get(cytokine)
+            if substrate is None:
+                continue
+            secreting = [i for i, cell in enumerate(immune_cells) if cell.cell_type == cell_type]
+            if secreting:
+                amounts = rate * np.array([immune_cells[i].activation_level for i in secreting])
+                substrate.add_sources(voxels[secreting], amounts)
     
     def to_dict(self) -> Dict:
         """Convert immune cell to dictionary for serialization."""
@@ -537,6 +717,10 @@ class VesselPoint:
     Here, we model vessels as stationary source points.
     """
     
+    __slots__ = (
+        'position', 'oxygen_supply', 'drug_supply', 'supply_radius', 'vessel_type', 'bbb_permeability'
+    )
+    
     def __init__(
         self,
         position: Tuple[float, float, float],
@@ -578,17 +762,61 @@ class TumorGeometry:
         center: Tuple[float, float, float],
         tumor_radius: float = 200.0,  # µm
         necrotic_core_radius: float = 50.0,  # µm, central necrosis
-        vessel_density: float = 0.01  # vessels per 100 µm²
+        vessel_density: float = 0.01,  # vessels per 100 µm²
+        seed: Optional[int] = None
     ):
         self.center = center
         self.tumor_radius = tumor_radius
         self.necrotic_core_radius = necrotic_core_radius
         self.vessel_density = vessel_density
         
+        # Generator for the batched generation and per-step draws. Without an
+        # explicit seed it is seeded from the global NumPy RNG, so
+        # np.random.seed() keeps runs reproducible.
+        if seed is None:
+            seed = int(np.random.randint(2**31))
+        self._rng = np.random.default_rng(seed)
+        
         self.tumor_cells: List[TumorCell] = []
         self.vessels: List[VesselPoint] = []
         self.immune_cells: List[ImmuneCell] = []
         
+        # Array copy of the tumor cells' hot fields, in tumor_cells order
+        self.cell_arrays = TumorCellArrays()
+        
+        # Per-phase cell lists, rebuilt lazily only for phases that changed
+        self._phase_index: Dict[CellPhase, List[TumorCell]] = {}
+        self._dirty: Set[CellPhase] = set(CellPhase)
+        self._indexed_cells: List[TumorCell] = []  # Owner of each cell_arrays row
+        self._living_cells: Optional[List[TumorCell]] = None  # None until rebuilt
+        
+        # Cell counts kept up to date on every transition, for O(1) metrics
+        self._phase_counts: Dict[CellPhase, int] = dict.fromkeys(CellPhase, 0)
+        self._living_count = 0
+        
+        # KD-tree over vessel positions, rebuilt when the vessel list changes
+        self._vessel_positions = np.zeros((0, 3))
+        self._vessel_points: List[Tuple[float, float, float]] = []
+        self._vessel_sq_norms = np.zeros(0)
+        self._vessel_tree: Optional[cKDTree] = None
+        self._vessel_tree_size = 0
+        
+        # KD-tree over living cells' (x, y), dropped when a cell dies, moves or is added
+        self._living_tree: Optional[cKDTree] = None
+        self._living_tree_rows = np.zeros(0, dtype=np.intp)
+        
+        # (cell_id, accumulated μg, lethal μg) of nanobot delivery kills since
+        # the last pop_drug_kills()
+        self._drug_kills: List[Tuple[int, float, float]] = []
+        
+        # Per-row voxel indices in one microenvironment, dropped when a cell
+        # moves or is added: (microenv, sampling voxels, source voxels)
+        self._cell_voxels: Optional[Tuple['Microenvironment', np.ndarray, np.ndarray]] = None
+        
+        # Per-row nearest vessel, dropped when a cell moves or is added or the
+        # vessel list changes: (vessel count, distances, vessel indices)
+        self._cell_vessels: Optional[Tuple[int, np.ndarray, np.ndarray]] = None
+        
     def generate_circular_tumor(
         self,
         cell_density: float = 0.001,  # cells per µm² (for 2D)
@@ -620,39 +848,44 @@ class TumorGeometry:
         
         print(f"  Generating {n_cells} tumor cells...")
         
-        # Generate cells in annular region (between necrotic core and tumor edge)
-        cell_id = 0
-        for _ in range(n_cells):
-            # Random angle
-            theta = np.random.uniform(0, 2 * np.pi)
-            
-            # Random radius in annular region
-            r = np.random.uniform(self.necrotic_core_radius, self.tumor_radius)
-            
-            # Position relative to center
-            x = self.center[0] + r * np.cos(theta)
-            y = self.center[1] + r * np.sin(theta)
-            z = self.center[2] if dimensionality == 3 else 0.0
-            
-            # Cells closer to core are more likely to be hypoxic
-            distance_from_core = r - self.necrotic_core_radius
-            normalized_distance = distance_from_core / (self.tumor_radius - self.necrotic_core_radius)
-            
-            # Inner 30% of viable region starts hypoxic
-            initial_phase = CellPhase.HYPOXIC if normalized_distance < 0.3 else CellPhase.VIABLE
-            
-            # Assign cell type based on position and randomness
-            cell_type = self._assign_cell_type(normalized_distance)
-            
+        # Size the array store for the whole tumor up front
+        self._adopt_appended_cells()
+        self.cell_arrays.reserve(len(self.tumor_cells) + n_cells)
+        
+        # Generate cells in annular region (between necrotic core and tumor edge):
+        # random angles and radii for all cells at once
+        theta = self._rng.uniform(0, 2 * np.pi, n_cells)
+        r = self._rng.uniform(self.necrotic_core_radius, self.tumor_radius, n_cells)
+        
+        # Positions relative to center
+        x = self.center[0] + r * np.cos(theta)
+        y = self.center[1] + r * np.sin(theta)
+        z = self.center[2] if dimensionality == 3 else 0.0
+        
+        # Cells closer to core are more likely to be hypoxic
+        distance_from_core = r - self.necrotic_core_radius
+        normalized_distance = distance_from_core / (self.tumor_radius - self.necrotic_core_radius)
+        
+        # Inner 30% of viable region starts hypoxic
+        hypoxic = normalized_distance < 0.3
+        
+        # Assign cell types based on position and randomness
+        type_codes = self._assign_cell_types(normalized_distance)
+        
+        first_id = len(self.tumor_cells)
+        new_cells = []
+        for i, (cell_x, cell_y, is_hypoxic, type_code) in enumerate(
+            zip(x.tolist(), y.tolist(), hypoxic.tolist(), type_codes.tolist())
+        ):
             cell = TumorCell(
-                cell_id=cell_id,
-                position=(x, y, z),
-                initial_phase=initial_phase,
-                cell_type=cell_type
+                cell_id=first_id + i,
+                position=(cell_x, cell_y, z),
+                initial_phase=CellPhase.HYPOXIC if is_hypoxic else CellPhase.VIABLE,
+                cell_type=CELL_TYPES[type_code]
             )
-            
-            self.tumor_cells.append(cell)
-            cell_id += 1
+            new_cells.append(cell)
+        
+        self.add_cells(new_cells)
         
         print(f"  Generated {len(self.tumor_cells)} tumor cells")
         
@@ -662,33 +895,34 @@ class TumorGeometry:
         # Generate immune cells
         self._generate_immune_cells(dimensionality)
     
-    def _assign_cell_type(self, normalized_distance: float) -> CellType:
+    def _assign_cell_types(self, normalized_distance: np.ndarray) -> np.ndarray:
         """
-        Assign cell type based on position and biological principles.
+        Assign cell types based on position and biological principles.
         
         Args:
-            normalized_distance: Distance from necrotic core (0-1)
+            normalized_distance: (N,) distances from necrotic core (0-1)
             
         Returns:
-            CellType based on position and randomness
+            (N,) TYPE_CODES based on position and one random draw per cell
         """
-        # Stem cells are more common in the core (hypoxic regions)
-        if normalized_distance < 0.2:
-            if np.random.random() < 0.3:  # 30% chance
-                return CellType.STEM_CELL
-        
-        # Resistant cells develop over time, more common in middle regions
-        if 0.3 < normalized_distance < 0.7:
-            if np.random.random() < 0.15:  # 15% chance
-                return CellType.RESISTANT
-        
-        # Invasive cells are more common at the periphery
-        if normalized_distance > 0.8:
-            if np.random.random() < 0.2:  # 20% chance
-                return CellType.INVASIVE
-        
-        # Default to differentiated cells
-        return CellType.DIFFERENTIATED
+        rand = self._rng.random(len(normalized_distance))
+        return np.select(
+            [
+                # Stem cells are more common in the core (hypoxic regions), 30% chance
+                (normalized_distance < 0.2) & (rand < 0.3),
+                # Resistant cells develop over time, more common in middle regions, 15% chance
+                (normalized_distance > 0.3) & (normalized_distance < 0.7) & (rand < 0.15),
+                # Invasive cells are more common at the periphery, 20% chance
+                (normalized_distance > 0.8) & (rand < 0.2)
+            ],
+            [
+                TYPE_CODES[CellType.STEM_CELL],
+                TYPE_CODES[CellType.RESISTANT],
+                TYPE_CODES[CellType.INVASIVE]
+            ],
+            # Default to differentiated cells
+            default=TYPE_CODES[CellType.DIFFERENTIATED]
+        )
         
     def _generate_peripheral_vasculature(self, dimensionality: int = 2):
         """
@@ -703,27 +937,28 @@ class TumorGeometry:
         
         print(f"  Generating {n_vessels} blood vessels...")
         
-        for _ in range(n_vessels):
-            theta = np.random.uniform(0, 2 * np.pi)
-            
-            # Vessels mostly at periphery (90-110% of tumor radius)
-            r = np.random.uniform(0.9 * self.tumor_radius, 1.1 * self.tumor_radius)
-            
-            x = self.center[0] + r * np.cos(theta)
-            y = self.center[1] + r * np.sin(theta)
-            z = self.center[2] if dimensionality == 3 else 0.0
-            
+        theta = self._rng.uniform(0, 2 * np.pi, n_vessels)
+        
+        # Vessels mostly at periphery (90-110% of tumor radius)
+        r = self._rng.uniform(0.9 * self.tumor_radius, 1.1 * self.tumor_radius, n_vessels)
+        
+        x = self.center[0] + r * np.cos(theta)
+        y = self.center[1] + r * np.sin(theta)
+        z = self.center[2] if dimensionality == 3 else 0.0
+        
+        # Vessels closer to brain tissue have BBB properties
+        outside = r > 1.2 * self.tumor_radius  # Outside tumor boundary
+        
+        for vessel_x, vessel_y, is_outside in zip(x.tolist(), y.tolist(), outside.tolist()):
             # Determine vessel type based on position
             vessel_type = "normal"
             bbb_permeability = 0.1
-            
-            # Vessels closer to brain tissue have BBB properties
-            if r > 1.2 * self.tumor_radius:  # Outside tumor boundary
+            if is_outside:
                 vessel_type = "bbb"
                 bbb_permeability = 0.05  # Very low permeability
             
             vessel = VesselPoint(
-                position=(x, y, z),
+                position=(vessel_x, vessel_y, z),
                 oxygen_supply=38.0,  # Normal tissue oxygen
                 supply_radius=50.0,   # Effective perfusion range
                 vessel_type=vessel_type,
@@ -732,6 +967,9 @@ class TumorGeometry:
             
             self.vessels.append(vessel)
         
+        # Index the finished vasculature once, before any nearest-vessel queries
+        self._build_vessel_tree()
+        
         print(f"  Generated {len(self.vessels)} vessels")
     
     def _generate_immune_cells(self, dimensionality: int = 2):
@@ -746,93 +984,428 @@ class TumorGeometry:
         
         print(f"  Generating {n_immune_cells} immune cells...")
         
-        immune_cell_id = 0
-        
-        for _ in range(n_immune_cells):
-            # Immune cells start near blood vessels
-            if self.vessels:
-                start_vessel = np.random.choice(self.vessels)
-                # Add random offset from vessel
-                offset = np.random.randn(2) * 30.0  # 30 µm std dev
-                x = start_vessel.position[0] + offset[0]
-                y = start_vessel.position[1] + offset[1]
-                z = start_vessel.position[2] if dimensionality == 3 else 0.0
-            else:
-                # Random position if no vessels
-                x = np.random.uniform(self.center[0] - self.tumor_radius, 
-                                   self.center[0] + self.tumor_radius)
-                y = np.random.uniform(self.center[1] - self.tumor_radius, 
-                                   self.center[1] + self.tumor_radius)
-                z = self.center[2] if dimensionality == 3 else 0.0
-            
-            # Assign immune cell type based on probabilities
-            cell_type = self._assign_immune_cell_type()
-            
-            # Random activation level
-            activation_level = np.random.uniform(0.3, 0.8)
-            
+        # Immune cells start near blood vessels
+        if self.vessels:
+            vessel_positions = _as_xyz([vessel.position for vessel in self.vessels])
+            start_positions = vessel_positions[self._rng.integers(len(self.vessels), size=n_immune_cells)]
+            # Add random offset from vessel
+            offsets = self._rng.standard_normal((n_immune_cells, 2)) * 30.0  # 30 µm std dev
+            x = start_positions[:, 0] + offsets[:, 0]
+            y = start_positions[:, 1] + offsets[:, 1]
+            z = start_positions[:, 2] if dimensionality == 3 else np.zeros(n_immune_cells)
+        else:
+            # Random position if no vessels
+            x = self._rng.uniform(self.center[0] - self.tumor_radius, 
+                                  self.center[0] + self.tumor_radius, n_immune_cells)
+            y = self._rng.uniform(self.center[1] - self.tumor_radius, 
+                                  self.center[1] + self.tumor_radius, n_immune_cells)
+            z = np.full(n_immune_cells, self.center[2] if dimensionality == 3 else 0.0)
+        
+        # Assign immune cell types based on probabilities
+        cell_types = self._assign_immune_cell_types(n_immune_cells)
+        
+        # Random activation levels
+        activation_levels = self._rng.uniform(0.3, 0.8, n_immune_cells)
+        
+        for immune_cell_id, (position, cell_type, activation_level) in enumerate(
+            zip(zip(x.tolist(), y.tolist(), z.tolist()), cell_types, activation_levels.tolist())
+        ):
             immune_cell = ImmuneCell(
                 cell_id=immune_cell_id,
-                position=(x, y, z),
+                position=position,
                 cell_type=cell_type,
-                activation_level=activation_level
+                activation_level=activation_level,
+                rng=self._rng
             )
             
             self.immune_cells.append(immune_cell)
-            immune_cell_id += 1
         
         print(f"  Generated {len(self.immune_cells)} immune cells")
     
-    def _assign_immune_cell_type(self) -> ImmuneCellType:
-        """Assign immune cell type based on biological frequencies."""
-        # Typical immune cell distribution in tumors
-        rand = np.random.random()
+    def _assign_immune_cell_types(self, n_cells: int) -> List[ImmuneCellType]:
+        """Assign immune cell types based on biological frequencies."""
+        # Typical immune cell distribution in tumors: 40% T cells,
+        # 30% macrophages, 20% NK cells, 10% dendritic cells
+        cell_types = (
+            ImmuneCellType.T_CELL, ImmuneCellType.MACROPHAGE,
+            ImmuneCellType.NK_CELL, ImmuneCellType.DENDRITIC
+        )
+        codes = np.searchsorted([0.4, 0.7, 0.9], self._rng.random(n_cells), side='right')
+        return [cell_types[code] for code in codes.tolist()]
+    
+    def add_cells(self, cells: List[TumorCell]):
+        """Add new tumor cells (e.g. daughters from division) to the geometry."""
+        self._adopt_appended_cells()
+        self.cell_arrays.append(cells)
+        for cell in cells:
+            cell._geometry = self
+            self._dirty.add(cell.phase)
+            self._phase_counts[cell.phase] += 1
+            self._living_count += cell.is_alive
+        self.tumor_cells.extend(cells)
+        self._indexed_cells.extend(cells)
+        self._living_cells = None
+        self._living_tree = None
+        self._cell_voxels = None
+        self._cell_vessels = None
+    
+    def _mark_phase_dirty(self, old_phase: CellPhase, new_phase: CellPhase):
+        """Record a cell's phase transition; invalidates both phase lists."""
+        self._dirty.add(old_phase)
+        self._dirty.add(new_phase)
+        self._phase_counts[old_phase] -= 1
+        self._phase_counts[new_phase] += 1
+    
+    def _mark_alive_changed(self, is_alive: bool):
+        """Record a cell dying (or reviving); invalidates the living-cell list."""
+        self._living_cells = None
+        self._living_tree = None
+        self._living_count += 1 if is_alive else -1
+    
+    def _adopt_appended_cells(self):
+        """
+        Adopt cells appended to (or removed from) tumor_cells directly and
+        recount everything.
+        """
+        cells = self.tumor_cells
+        indexed = self._indexed_cells
+        if len(cells) == len(indexed) and (not cells or cells[-1] is indexed[-1]):
+            return
+        
+        if len(cells) > len(indexed) and all(map(operator.is_, cells, indexed)):
+            # Only the new tail needs rows; existing rows keep their state
+            adopted = cells[len(indexed):]
+        else:
+            # Cells were removed, so rows no longer line up: release the
+            # removed cells, then re-index the rest
+            remaining = set(map(id, cells))
+            self._detach_cells([cell for cell in indexed if id(cell) not in remaining])
+            adopted = cells
+            self.cell_arrays.clear()
+        self.cell_arrays.append(adopted)
+        for cell in adopted:
+            cell._geometry = self
+        self._dirty.update(CellPhase)
+        self._indexed_cells = list(cells)
+        self._living_cells = None
+        self._living_tree = None
+        self._cell_voxels = None
+        self._cell_vessels = None
+        
+        phase_totals = np.bincount(self.cell_arrays.phases, minlength=len(PHASE_CODES)).tolist()
+        self._phase_counts = {phase: phase_totals[code] for phase, code in PHASE_CODES.items()}
+        self._living_count = int(np.count_nonzero(self.cell_arrays.alive))
+    
+    def _detach_cells(self, cells: List[TumorCell]):
+        """Move removed cells' column values back into their own slots and unlink them."""
+        columns = self.cell_arrays._columns
+        for cell in cells:
+            for name, column in columns.items():
+                setattr(cell, '_' + name, float(column[cell._index]))
+            cell._geometry = None
+            cell._index = -1
+    
+    def _refresh_phase_index(self):
+        """Rebuild cached phase lists that were invalidated by phase transitions."""
+        self._adopt_appended_cells()
+        
+        if not self._dirty:
+            return
+        
+        # Rebuild every dirty phase from the phase codes, keeping tumor_cells order
+        phases = self.cell_arrays.phases
+        cells = self.tumor_cells
+        for phase in self._dirty:
+            rows = np.flatnonzero(phases == PHASE_CODES[phase])
+            self._phase_index[phase] = [cells[row] for row in rows.tolist()]
+        self._dirty.clear()
+    
+    def update_oxygen_and_drug(
+        self,
+        rows: np.ndarray,
+        oxygen_concentrations: np.ndarray,
+        drug_concentrations: np.ndarray,
+        dt: float
+    ):
+        """
+        Vectorized TumorCell.update_oxygen_status followed by absorb_drug for
+        many living cells, in one pass: each column is gathered for the rows
+        once, updated, and written back once.
+        
+        Args:
+            rows: Indices into tumor_cells of living cells
+            oxygen_concentrations: Local O₂ in mmHg at each of those cells
+            drug_concentrations: Local drug concentration at each of those cells
+            dt: Timestep in minutes
+        """
+        arrays = self.cell_arrays
+        hypoxic_duration = arrays.column('hypoxic_duration')[rows]
+        accumulated_drug = arrays.column('accumulated_drug')[rows]
+        resistance = arrays.resistance[rows]
+        sensitivity = arrays.column('drug_sensitivity')[rows]
+        was_hypoxic = arrays.phases[rows] == PHASE_CODES[CellPhase.HYPOXIC]
+        
+        # Hypoxia accumulates; cells that get oxygen back recover and reset
+        hypoxic = oxygen_concentrations < arrays.column('hypoxic_threshold')[rows]
+        recovered = ~hypoxic & was_hypoxic
+        hypoxic_duration[hypoxic] += dt
+        hypoxic_duration[recovered] = 0.0
+        
+        # Hypoxia that has lasted long enough causes necrosis
+        necrotic = hypoxic & (hypoxic_duration > arrays.column('necrotic_time_threshold')[rows])
+        
+        # Cells still alive absorb drug, after resistance
+        drug_absorbed = np.where(necrotic, 0.0, drug_concentrations * (1.0 - resistance) * sensitivity * dt * 2.5)
+        accumulated_drug += drug_absorbed
+        
+        # Adaptive resistance: one draw per absorbing cell
+        mutating = drug_absorbed > 0
+        mutating[mutating] = self._rng.random(np.count_nonzero(mutating)) < arrays.column('mutation_rate')[rows[mutating]] * dt
+        resistance[mutating] = np.minimum(1.0, resistance[mutating] + 0.01)
+        sensitivity[mutating] = np.maximum(0.1, sensitivity[mutating] - 0.01)
+        
+        # Lethal dose reached (adjusted for resistance)
+        lethal = ~necrotic & (accumulated_drug >= arrays.column('lethal_drug_dose')[rows] * (1.0 + resistance))
+        
+        arrays.column('hypoxic_duration')[rows] = hypoxic_duration
+        arrays.column('accumulated_drug')[rows] = accumulated_drug
+        arrays.resistance[rows] = resistance
+        arrays.column('drug_sensitivity')[rows] = sensitivity
+        
+        # Apply the (few) phase transitions through the cells, so phase
+        # counts and cached cell lists stay current
+        cells = self.tumor_cells
+        for row in rows[hypoxic & ~necrotic & ~lethal & ~was_hypoxic].tolist():
+            cells[row].phase = CellPhase.HYPOXIC
+        for row in rows[recovered & ~lethal].tolist():
+            cells[row].phase = CellPhase.VIABLE
+        for row in rows[necrotic].tolist():
+            cell = cells[row]
+            cell.phase = CellPhase.NECROTIC
+            cell.is_alive = False
+            cell.time_of_death = 'necrosis'
+        for row in rows[lethal].tolist():
+            cell = cells[row]
+            cell.phase = CellPhase.APOPTOTIC
+            cell.is_alive = False
+            cell.time_of_death = 'apoptosis'
+    
+    def update_immune_cells(self, dt: float):
+        """
+        Vectorized ImmuneCell.update for every active immune cell.
+        
+        Immune cells age, pick the nearest living tumor cell when their
+        target is gone, and attack targets within range. Several immune
+        cells attacking the same tumor cell in one step sum their damage.
+        
+        Args:
+            dt: Timestep in minutes
+        """
+        active_cells = []
+        for immune_cell in self.immune_cells:
+            if not immune_cell.is_active:
+                continue
+            immune_cell.age += dt
+            # Check if cell has died of old age
+            if immune_cell.age > immune_cell.lifespan:
+                immune_cell.is_active = False
+            else:
+                active_cells.append(immune_cell)
+        
+        # Find nearest tumor cell to target
+        untargeted = [
+            cell for cell in active_cells
+            if not cell.target_cell or not cell.target_cell.is_alive
+        ]
+        if untargeted:
+            nearest = self.find_nearest_living_cells([cell.position for cell in untargeted])
+            for immune_cell, target in zip(untargeted, nearest):
+                immune_cell.target_cell = target
+        
+        attackers = [cell for cell in active_cells if cell.target_cell is not None]
+        if not attackers:
+            return
+        arrays = self.cell_arrays
+        target_rows = np.array([cell.target_cell._index for cell in attackers])
+        
+        # Attack target cells within attack range (20 µm)
+        offsets = np.array([cell.position[:2] for cell in attackers], dtype=float)
+        offsets -= arrays.positions[target_rows, :2]
+        in_range = np.einsum('ij,ij->i', offsets, offsets) < 400.0
+        rows = target_rows[in_range]
+        
+        # Damage based on cytotoxicity and activation
+        damage = np.array(
+            [cell.cytotoxicity * cell.activation_level for cell in attackers], dtype=float
+        )[in_range] * dt * 10.0
+        
+        # Damage reduces drug resistance and increases drug sensitivity
+        # (immune cells make cells more vulnerable)
+        resistance = arrays.resistance
+        sensitivity = arrays.column('drug_sensitivity')
+        np.subtract.at(resistance, rows, damage * 0.1)
+        np.add.at(sensitivity, rows, damage * 0.05)
+        resistance[rows] = np.maximum(0.0, resistance[rows])
+        sensitivity[rows] = np.minimum(2.0, sensitivity[rows])
         
-        if rand < 0.4:  # 40% T cells
-            return ImmuneCellType.T_CELL
-        elif rand < 0.7:  # 30% Macrophages
-            return ImmuneCellType.MACROPHAGE
-        elif rand < 0.9:  # 20% NK cells
-            return ImmuneCellType.NK_CELL
-        else:  # 10% Dendritic cells
-            return ImmuneCellType.DENDRITIC
+        # If damage is high enough, kill the cell directly
+        lethal = damage > 0.5
+        killed = rows[lethal][self._rng.random(np.count_nonzero(lethal)) < damage[lethal]]
+        cells = self.tumor_cells
+        for row in np.unique(killed).tolist():
+            cell = cells[row]
+            cell.phase = CellPhase.APOPTOTIC
+            cell.is_alive = False
+            cell.time_of_death = 'immune_attack'
     
     def get_cells_in_phase(self, phase: CellPhase) -> List[TumorCell]:
-        """Get all cells in a specific phase."""
-        return [cell for cell in self.tumor_cells if cell.phase == phase]
+        """
+        Get all cells in a specific phase.
+        
+        The returned list is cached between phase transitions and must be
+        treated as read-only.
+        """
+        self._refresh_phase_index()
+        return self._phase_index.get(phase, [])
+    
+    def count_cells_in_phase(self, phase: CellPhase) -> int:
+        """Number of cells in a phase, without building the phase list."""
+        self._adopt_appended_cells()
+        return self._phase_counts[phase]
+    
+    def count_living_cells(self) -> int:
+        """Number of living cells, without building the living-cell list."""
+        self._adopt_appended_cells()
+        return self._living_count
     
     def get_living_cells(self) -> List[TumorCell]:
-        """Get all living tumor cells."""
-        return [cell for cell in self.tumor_cells if cell.is_alive]
+        """
+        Get all living tumor cells.
+        
+        The returned list is cached until a cell dies or cells are added, and
+        must be treated as read-only.
+        """
+        self._refresh_phase_index()
+        if self._living_cells is None:
+            cells = self.tumor_cells
+            self._living_cells = [cells[row] for row in np.flatnonzero(self.cell_arrays.alive).tolist()]
+        return self._living_cells
+    
+    def find_nearest_living_cells(self, positions) -> List[Optional[TumorCell]]:
+        """
+        Find the nearest living tumor cell (in x, y) to each of several positions.
+        
+        Args:
+            positions: Sequence or (N, 2|3) array of positions in microns
+            
+        Returns:
+            One TumorCell per position, or Nones if no cell is alive
+        """
+        self._adopt_appended_cells()
+        if self._living_tree is None:
+            rows = np.flatnonzero(self.cell_arrays.alive)
+            if len(rows) == 0:
+                return [None] * len(positions)
+            self._living_tree = cKDTree(self.cell_arrays.positions[rows, :2])
+            self._living_tree_rows = rows
+        
+        _, nearest = self._living_tree.query(np.asarray(positions, dtype=float)[:, :2])
+        cells = self.tumor_cells
+        return [cells[row] for row in self._living_tree_rows[nearest].tolist()]
+    
+    def cell_voxels(self, microenv: 'Microenvironment') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Voxel indices of every tumor cell, cached until a cell moves or is added.
+        
+        Args:
+            microenv: The microenvironment whose grid to index
+            
+        Returns:
+            (N, 3) nearest voxels for sampling (as in sample_batch) and
+            (N, 3) containing voxels for sources (as in positions_to_voxels),
+            in tumor_cells order
+        """
+        self._adopt_appended_cells()
+        if self._cell_voxels is None or self._cell_voxels[0] is not microenv:
+            positions = self.cell_arrays.positions
+            self._cell_voxels = (
+                microenv,
+                microenv.positions_to_nearest_voxels(positions),
+                microenv.positions_to_voxels(positions)
+            )
+        return self._cell_voxels[1], self._cell_voxels[2]
+    
+    def snapshot_living_cells(self) -> Dict[str, np.ndarray]:
+        """
+        Column-wise snapshot of the living tumor cells for per-step serialization.
+        
+        Carries the same fields as TumorCell.to_dict(), one array per field
+        in tumor_cells order, so callers build their records from a handful
+        of arrays instead of one dict per cell.
+        """
+        self._adopt_appended_cells()
+        arrays = self.cell_arrays
+        rows = np.flatnonzero(arrays.alive)
+        living = [self.tumor_cells[row] for row in rows.tolist()]
+        n_living = len(living)
+        phase_codes = arrays.phases[rows]
+        
+        # Oxygen consumption as in TumorCell.get_oxygen_consumption
+        oxygen_uptake = arrays.column('oxygen_uptake_rate')[rows].astype(float) * np.select(
+            [
+                phase_codes == PHASE_CODES[CellPhase.VIABLE],
+                phase_codes == PHASE_CODES[CellPhase.HYPOXIC]
+            ],
+            [1.0, 0.3],
+            default=0.0
+        )
+        
+        return {
+            'id': np.fromiter((cell.cell_id for cell in living), dtype=int, count=n_living),
+            'position': arrays.positions[rows],
+            'radius': np.fromiter((cell.radius for cell in living), dtype=float, count=n_living),
+            'phase': np.array([phase.value for phase in PHASE_CODES])[phase_codes],
+            'cell_type': np.array([cell_type.value for cell_type in CELL_TYPES])[arrays.types[rows]],
+            'is_alive': np.ones(n_living, dtype=bool),
+            'oxygen_uptake': oxygen_uptake,
+            'accumulated_drug': arrays.column('accumulated_drug')[rows].astype(float),
+            'hypoxic_duration': arrays.column('hypoxic_duration')[rows].astype(float),
+            'resistance_level': arrays.resistance[rows].astype(float),
+            'drug_sensitivity': arrays.column('drug_sensitivity')[rows].astype(float),
+            'generation': np.fromiter((cell.generation for cell in living), dtype=int, count=n_living),
+        }
+    
+    def pop_drug_kills(self) -> List[Tuple[int, float, float]]:
+        """Return and clear the (cell_id, accumulated, lethal dose) of recent delivery kills."""
+        kills, self._drug_kills = self._drug_kills, []
+        return kills
     
     def get_dead_cells(self) -> List[TumorCell]:
         """Get all dead tumor cells."""
-        return [cell for cell in self.tumor_cells if not cell.is_alive]
+        self._adopt_appended_cells()
+        cells = self.tumor_cells
+        return [cells[row] for row in np.flatnonzero(~self.cell_arrays.alive).tolist()]
     
     def get_tumor_statistics(self) -> Dict:
         """Get summary statistics about the tumor."""
         total_cells = len(self.tumor_cells)
-        living_cells = len(self.get_living_cells())
+        living_cells = self.count_living_cells()
         
         phase_counts = {}
         for phase in CellPhase:
-            phase_counts[phase.value] = len(self.get_cells_in_phase(phase))
+            phase_counts[phase.value] = self.count_cells_in_phase(phase)
         
         # Count cells by type
-        type_counts = {}
-        for cell_type in CellType:
-            type_counts[cell_type.value] = len([
-                cell for cell in self.tumor_cells 
-                if cell.cell_type == cell_type
-            ])
-        
-        # Count immune cells
-        immune_counts = {}
-        for immune_type in ImmuneCellType:
-            immune_counts[immune_type.value] = len([
-                cell for cell in self.immune_cells 
-                if cell.cell_type == immune_type and cell.is_active
-            ])
+        type_totals = np.bincount(self.cell_arrays.types, minlength=len(CELL_TYPES))
+        type_counts = {cell_type.value: count for cell_type, count in zip(CELL_TYPES, type_totals.tolist())}
+        
+        # Count active immune cells by type in one pass
+        immune_counts = {immune_type.value: 0 for immune_type in ImmuneCellType}
+        n_active_immune = 0
+        for cell in self.immune_cells:
+            if cell.is_active:
+                immune_counts[cell.cell_type.value] += 1
+                n_active_immune += 1
         
         return {
             'total_cells': total_cells,
@@ -843,46 +1416,176 @@ class TumorGeometry:
             'cell_type_distribution': type_counts,
             'immune_cell_distribution': immune_counts,
             'n_vessels': len(self.vessels),
-            'n_immune_cells': len([cell for cell in self.immune_cells if cell.is_active])
+            'n_immune_cells': n_active_immune
         }
     
     def is_inside_tumor(self, position: Tuple[float, ...]) -> bool:
         """Check if a position is inside the tumor volume."""
-        distance = np.sqrt(
-            (position[0] - self.center[0])**2 +
-            (position[1] - self.center[1])**2 +
-            (position[2] - self.center[2] if len(position) > 2 else 0)**2
-        )
-        return distance <= self.tumor_radius
+        return self._squared_distance_to_center(position) <= self.tumor_radius * self.tumor_radius
     
     def is_inside_necrotic_core(self, position: Tuple[float, ...]) -> bool:
         """Check if a position is inside the necrotic core."""
-        distance = np.sqrt(
-            (position[0] - self.center[0])**2 +
-            (position[1] - self.center[1])**2 +
-            (position[2] - self.center[2] if len(position) > 2 else 0)**2
-        )
-        return distance <= self.necrotic_core_radius
+        return self._squared_distance_to_center(position) <= self.necrotic_core_radius * self.necrotic_core_radius
+    
+    def _squared_distance_to_center(self, position: Tuple[float, ...]) -> float:
+        """Squared distance (µm²) of one position from the tumor center, in x, y (and z if given)."""
+        dx = position[0] - self.center[0]
+        dy = position[1] - self.center[1]
+        dz = (position[2] - self.center[2]) if len(position) > 2 else 0.0
+        return dx * dx + dy * dy + dz * dz
+    
+    def are_inside_tumor(self, positions) -> np.ndarray:
+        """
+        Vectorized is_inside_tumor for many positions.
+        
+        Args:
+            positions: Sequence or (N, 2|3) array of positions in microns
+            
+        Returns:
+            (N,) boolean mask
+        """
+        return self._squared_distances_to_center(positions) <= self.tumor_radius * self.tumor_radius
+    
+    def are_inside_necrotic_core(self, positions) -> np.ndarray:
+        """
+        Vectorized is_inside_necrotic_core for many positions.
+        
+        Args:
+            positions: Sequence or (N, 2|3) array of positions in microns
+            
+        Returns:
+            (N,) boolean mask
+        """
+        return self._squared_distances_to_center(positions) <= self.necrotic_core_radius * self.necrotic_core_radius
+    
+    def _squared_distances_to_center(self, positions) -> np.ndarray:
+        """Squared distances (µm²) of positions from the tumor center, in x, y (and z if given)."""
+        points = np.atleast_2d(np.asarray(positions, dtype=float))[:, :3]
+        offsets = points - np.asarray(self.center, dtype=float)[:points.shape[1]]
+        return np.einsum('ij,ij->i', offsets, offsets)
     
     def find_nearest_vessel(self, position: Tuple[float, ...]) -> Optional[VesselPoint]:
         """Find the nearest blood vessel to a position."""
         if not self.vessels:
             return None
+        
+        if self._vessel_tree is None or self._vessel_tree_size != len(self.vessels):
+            self._build_vessel_tree()
+        
+        px = float(position[0])
+        py = float(position[1])
+        pz = float(position[2]) if len(position) > 2 else 0.0
+        n_vessels = len(self.vessels)
+        if n_vessels < _PYTHON_SCAN_VESSELS:
+            # For a handful of vessels plain float arithmetic beats any array call
+            index = 0
+            best = math.inf
+            for i, (vx, vy, vz) in enumerate(self._vessel_points):
+                dx = vx - px
+                dy = vy - py
+                dz = vz - pz
+                distance_sq = dx * dx + dy * dy + dz * dz
+                if distance_sq < best:
+                    best = distance_sq
+                    index = i
+        elif n_vessels < _BRUTE_FORCE_VESSELS:
+            # A direct scan of a few hundred vessels beats a tree query's call overhead
+            offsets = self._vessel_positions - np.array((px, py, pz))
+            index = int(np.einsum('ij,ij->i', offsets, offsets).argmin())
+        else:
+            _, index = self._vessel_tree.query((px, py, pz), k=1)
+        return self.vessels[index]
+    
+    def find_nearest_vessels(self, positions) -> np.ndarray:
+        """
+        Find the nearest blood vessel to each of several positions.
+        
+        Args:
+            positions: Sequence or (N, 2|3) array of positions in microns;
+                (x, y) positions are treated as lying at z = 0
             
-        distances = [
-            np.sqrt(sum((p - v)**2 for p, v in zip(position, vessel.position)))
-            for vessel in self.vessels
-        ]
+        Returns:
+            Array of N indices into self.vessels (empty if there are no vessels)
+        """
+        _, indices = self._query_vessels(_as_xyz(positions))
+        return indices
+    
+    def nearest_vessel_for_all_cells(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest blood vessel to every tumor cell, in one batched query.
         
-        nearest_idx = np.argmin(distances)
-        return self.vessels[nearest_idx]
+        Cached until a cell moves or is added or the vessel list changes.
+        Consume the results with NumPy (e.g. ``supply[indices]``) rather than
+        looping over them in Python.
+        
+        Returns:
+            (N,) distances in microns and (N,) indices into self.vessels,
+            in tumor_cells order; both empty if there are no vessels
+        """
+        self._adopt_appended_cells()
+        if self._cell_vessels is None or self._cell_vessels[0] != len(self.vessels):
+            distances, indices = self._query_vessels(_as_xyz(self.cell_arrays.positions))
+            self._cell_vessels = (len(self.vessels), distances, indices)
+        return self._cell_vessels[1], self._cell_vessels[2]
+    
+    def _query_vessels(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Distances to and indices of the nearest vessel for (N, 3) points; empty without vessels."""
+        if not self.vessels:
+            return np.zeros(0), np.zeros(0, dtype=np.intp)
+        if self._vessel_tree is None or self._vessel_tree_size != len(self.vessels):
+            self._build_vessel_tree()
+        
+        n_vessels = len(self._vessel_positions)
+        if n_vessels < _BRUTE_FORCE_VESSELS and len(points) * n_vessels <= _MAX_DISTANCE_MATRIX_SIZE:
+            # ||p - v||² = ||p||² + ||v||² - 2 p·v, with ||p||² dropped as constant
+            # per row, so the whole pass is one matrix product and an argmin
+            indices = (self._vessel_sq_norms - 2.0 * (points @ self._vessel_positions.T)).argmin(axis=1)
+            offsets = points - self._vessel_positions[indices]
+            return np.sqrt(np.einsum('ij,ij->i', offsets, offsets)), indices
+        
+        # Spread large batches (e.g. every cell) across cores; threading only costs for a few queries
+        workers = -1 if len(points) >= _PARALLEL_QUERY_SIZE else 1
+        return self._vessel_tree.query(points, k=1, workers=workers)
+    
+    def _build_vessel_tree(self):
+        """(Re)build the vessel position array and KD-tree from self.vessels."""
+        if self.vessels:
+            self._vessel_positions = _as_xyz([vessel.position for vessel in self.vessels])
+        else:
+            self._vessel_positions = np.zeros((0, 3))
+        self._vessel_points = [tuple(point) for point in self._vessel_positions.tolist()]
+        self._vessel_sq_norms = np.einsum('ij,ij->i', self._vessel_positions, self._vessel_positions)
+        self._vessel_tree = cKDTree(self._vessel_positions)
+        self._vessel_tree_size = len(self.vessels)
+
+
+# Batch size above which KD-tree queries use all cores
+_PARALLEL_QUERY_SIZE = 1024
+
+# Vessel count below which nearest-vessel lookups scan instead of querying the tree
+_BRUTE_FORCE_VESSELS = 256
+
+# Vessel count below which single lookups scan in pure Python instead of NumPy
+_PYTHON_SCAN_VESSELS = 32
+
+# Largest points x vessels distance matrix a batched scan may allocate
+_MAX_DISTANCE_MATRIX_SIZE = 4_000_000
+
+
+def _as_xyz(positions) -> np.ndarray:
+    """Stack positions into an (N, 3) float array, padding 2D positions with z = 0."""
+    points = np.atleast_2d(np.asarray(positions, dtype=float))
+    if points.shape[1] < 3:
+        points = np.pad(points, ((0, 0), (0, 3 - points.shape[1])))
+    return points[:, :3]
 
 
 def create_simple_tumor_environment(
     domain_size: float = 600.0,  # µm
     tumor_radius: float = 200.0,
     cell_density: float = 0.001,
-    dimensionality: int = 2
+    dimensionality: int = 2,
+    seed: Optional[int] = None
 ) -> TumorGeometry:
     """
     Create a simple tumor geometry for testing.
@@ -892,6 +1595,7 @@ def create_simple_tumor_environment(
         tumor_radius: Radius of tumor (µm)
         cell_density: Cells per µm² (2D) or µm³ (3D)
         dimensionality: 2 or 3
+        seed: Seed for the geometry's random generator
         
     Returns:
         TumorGeometry with generated cells and vessels
@@ -902,7 +1606,8 @@ def create_simple_tumor_environment(
         center=center,
         tumor_radius=tumor_radius,
         necrotic_core_radius=tumor_radius * 0.25,  # 25% necrotic core
-        vessel_density=0.01
+        vessel_density=0.01,
+        seed=seed
     )
     
     geometry.generate_circular_tumor(
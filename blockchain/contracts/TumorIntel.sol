@@ -64,6 +64,36 @@ contract TumorIntel {
      * @param priority Priority level (1-10, 10 being highest)
      */
     function reportIntel(uint x, uint y, PinType pinType, uint priority) public returns (uint) {
+        return _reportIntel(x, y, pinType, priority);
+    }
+
+    /**
+     * @dev Report several intel pins in one transaction
+     * @param xs X coordinates in micrometers
+     * @param ys Y coordinates in micrometers
+     * @param pinTypes Types of intelligence being reported
+     * @param priorities Priority levels (1-10, 10 being highest)
+     * @return ID of the first pin added
+     */
+    function reportIntelBatch(
+        uint[] calldata xs,
+        uint[] calldata ys,
+        PinType[] calldata pinTypes,
+        uint[] calldata priorities
+    ) public returns (uint) {
+        require(
+            xs.length == ys.length && xs.length == pinTypes.length && xs.length == priorities.length,
+            "Array lengths must match"
+        );
+        
+        uint firstPinId = intelPins.length;
+        for (uint i = 0; i < xs.length; i++) {
+            _reportIntel(xs[i], ys[i], pinTypes[i], priorities[i]);
+        }
+        return firstPinId;
+    }
+
+    function _reportIntel(uint x, uint y, PinType pinType, uint priority) internal returns (uint) {
         require(priority >= 1 && priority <= 10, "Priority must be between 1 and 10");
         
         uint pinId = intelPins.length;
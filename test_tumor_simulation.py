@@ -17,7 +17,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 import numpy as np
 from backend.biofvm import Microenvironment, create_oxygen_substrate, create_drug_substrate, create_pheromone_substrate
-from backend.tumor_environment import TumorGeometry, CellPhase, create_simple_tumor_environment
+from backend.tumor_environment import TumorGeometry, TumorCell, CellPhase, CellType, create_simple_tumor_environment
 from backend.nanobot_simulation import TumorNanobotModel
 
 def test_biofvm():
@@ -211,6 +211,79 @@ def test_chemotaxis():
     return True
 
 
+def test_cell_arrays():
+    """Test that cell state survives the structure-of-arrays bookkeeping."""
+    print("\n" + "="*70)
+    print("TEST 5: Tumor Cell Arrays")
+    print("="*70)
+    
+    geometry = TumorGeometry(center=(200.0, 200.0, 0.0), tumor_radius=150.0, seed=0)
+    
+    def make_cells(first_id, n):
+        return [
+            TumorCell(cell_id=first_id + i, position=(100.0 + i, 200.0, 0.0), cell_type=CellType.DIFFERENTIATED)
+            for i in range(n)
+        ]
+    
+    # add_cells past the initial capacity (256 rows)
+    geometry.add_cells(make_cells(0, 200))
+    geometry.add_cells(make_cells(200, 100))
+    expected_uptake = TumorCell(cell_id=-1, position=(0.0, 0.0, 0.0)).oxygen_uptake_rate
+    expected_dose = TumorCell(cell_id=-1, position=(0.0, 0.0, 0.0)).lethal_drug_dose
+    assert geometry.count_living_cells() == 300
+    assert geometry.tumor_cells[5].oxygen_uptake_rate == expected_uptake
+    assert geometry.tumor_cells[250].lethal_drug_dose == expected_dose
+    print(f"\n✓ add_cells past capacity kept per-cell values")
+    
+    # Cells appended to tumor_cells directly, again past capacity (512 rows)
+    geometry.tumor_cells[5].accumulated_drug = 0.25
+    geometry.tumor_cells.extend(make_cells(300, 300))
+    assert geometry.count_living_cells() == 600
+    assert len(geometry.cell_arrays.positions) == 600
+    assert geometry.tumor_cells[5].oxygen_uptake_rate == expected_uptake
+    assert geometry.tumor_cells[5].lethal_drug_dose == expected_dose
+    assert geometry.tumor_cells[5].accumulated_drug == 0.25
+    assert geometry.tumor_cells[550].lethal_drug_dose == expected_dose
+    assert np.allclose(geometry.cell_arrays.positions[550], geometry.tumor_cells[550].position)
+    print(f"✓ Directly appended cells adopted without losing state")
+    
+    # A lethal nanobot delivery keeps the cell, its row and the counts in sync
+    cell = geometry.tumor_cells[42]
+    assert cell.accumulate_drug(expected_dose)
+    assert not cell.is_alive
+    assert not geometry.cell_arrays.alive[cell._index]
+    assert cell.phase == CellPhase.APOPTOTIC
+    assert geometry.count_living_cells() == 599
+    assert geometry.count_cells_in_phase(CellPhase.APOPTOTIC) == 1
+    assert cell not in geometry.get_living_cells()
+    print(f"✓ Drug kill reflected in is_alive, the alive mask and the counts")
+    
+    # Cells removed from tumor_cells directly are detached with their state
+    removed = geometry.tumor_cells.pop(5)
+    assert geometry.count_living_cells() == 598
+    assert removed.accumulated_drug == 0.25
+    assert removed.oxygen_uptake_rate == expected_uptake
+    removed.accumulated_drug = 999.0
+    assert all(cell.accumulated_drug != 999.0 for cell in geometry.tumor_cells)
+    assert geometry.tumor_cells[5].cell_id == 6
+    assert np.allclose(geometry.cell_arrays.positions[5], geometry.tumor_cells[5].position)
+    print(f"✓ Directly removed cells detached without touching other rows")
+    
+    # A removal and an append between two queries (same length)
+    first = geometry.tumor_cells.pop(0)
+    geometry.tumor_cells.append(TumorCell(cell_id=600, position=(50.0, 60.0, 0.0)))
+    assert geometry.count_living_cells() == 598
+    first.accumulated_drug = 999.0
+    assert all(cell.accumulated_drug != 999.0 for cell in geometry.tumor_cells)
+    assert geometry.tumor_cells[-1].lethal_drug_dose == expected_dose
+    assert np.allclose(geometry.cell_arrays.positions[-1], (50.0, 60.0, 0.0))
+    print(f"✓ Removal plus append re-indexed every cell")
+    
+    print(f"\n✓ Tumor cell arrays working correctly!")
+    
+    return True
+
+
 def run_all_tests():
     """Run all tests."""
     print("\n" + "="*70)
@@ -221,7 +294,8 @@ def run_all_tests():
         ("BioFVM Substrate System", test_biofvm),
         ("Tumor Environment", test_tumor_environment),
         ("Nanobot Simulation", test_nanobot_model),
-        ("Chemotaxis Behavior", test_chemotaxis)
+        ("Chemotaxis Behavior", test_chemotaxis),
+        ("Tumor Cell Arrays", test_cell_arrays)
     ]
     
     results = []